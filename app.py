@@ -1,9 +1,36 @@
+import io
 import os
-from flask import Flask, request, jsonify, send_from_directory
+import re
+import csv
+import json
+import tempfile
+import mimetypes
+import time
+import base64
+import click
+import fcntl
+import hashlib
+import threading
+import unicodedata
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from flask import Flask, Response, g, has_request_context, request, jsonify, send_file, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
-from datetime import datetime, date
+from sqlalchemy import case, event, func, inspect, literal, literal_column, or_, select, sql, text, tuple_, union_all, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, date, timedelta
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 from werkzeug.middleware.proxy_fix import ProxyFix
+from xml.sax.saxutils import escape as xml_escape
 
 # Configuração de caminhos
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -19,10 +46,222 @@ print(f"[EMUNAH] Static folder: {STATIC_FOLDER}", flush=True)
 print(f"[EMUNAH] Build exists: {has_build}", flush=True)
 
 # Criar aplicação Flask
-app = Flask(__name__, static_folder=STATIC_FOLDER, static_url_path='')
+# Sem rota estática do Flask: serve() cuida do build (manifesto + cache)
+app = Flask(__name__, static_folder=None)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 app.secret_key = os.environ.get('SESSION_SECRET', 'dev-secret-key-change-in-production')
 
+# ============ MÉTRICAS ============
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    """Histograma no formato de exposição do Prometheus.
+
+    Os contadores ficam na memória do processo; com METRICS_DIR os workers
+    somam os de todos (ver write_metrics_snapshot).
+    """
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """Séries em formato JSON: [[rótulos, contagens por bucket, soma, total], ...]."""
+        with self.lock:
+            return [[list(labels), list(counts), total, count]
+                    for labels, (counts, total, count) in self.series.items()]
+
+    @staticmethod
+    def merge(series, snapshot):
+        for labels, counts, total, count in snapshot:
+            target = series.setdefault(tuple(labels), [[0] * len(counts), 0.0, 0])
+            target[0] = [a + b for a, b in zip(target[0], counts)]
+            target[1] += total
+            target[2] += count
+
+    def render(self, series=None):
+        if series is None:
+            series = {}
+            self.merge(series, self.snapshot())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(series.items()):
+            base = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            prefix = base + ',' if base else ''
+            suffix = f'{{{base}}}' if base else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+request_latency = Histogram('emunah_http_request_duration_seconds', 'Latência por rota',
+                            LATENCY_BUCKETS, ('route', 'method', 'status'))
+request_sql_statements = Histogram('emunah_http_request_sql_statements', 'Comandos SQL por requisição',
+                                   SQL_COUNT_BUCKETS, ('route', 'method'))
+request_db_time = Histogram('emunah_http_request_db_seconds', 'Tempo total no banco por requisição',
+                            LATENCY_BUCKETS, ('route', 'method'))
+pool_checkout_wait = Histogram('emunah_db_pool_checkout_wait_seconds', 'Espera por conexão do pool',
+                               LATENCY_BUCKETS, ())
+
+HISTOGRAMS = (request_latency, request_sql_statements, request_db_time, pool_checkout_wait)
+
+# Cada worker do gunicorn (e do uvicorn) tem os próprios contadores. Com
+# METRICS_DIR, cada um regrava um snapshot em METRICS_DIR/worker-<pid>-<início>.json
+# até METRICS_FLUSH_SECONDS depois de cada requisição e /api/metrics soma os
+# arquivos de todos; ao sair, o worker junta o seu em archive.json (worker_exit
+# em gunicorn.conf.py), então reciclar workers não zera os contadores. Sem
+# METRICS_DIR os histogramas são só do worker que atendeu o scrape.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 1))
+METRICS_ARCHIVE = 'archive.json'
+_metrics_started = int(time.time())
+_metrics_flush = {'timer': None}
+_metrics_flush_lock = threading.Lock()
+
+def metrics_path(name=None):
+    # pid lido na hora: com --preload o módulo é importado antes do fork
+    return os.path.join(METRICS_DIR, name or f'worker-{os.getpid()}-{_metrics_started}.json')
+
+def write_json_atomically(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def write_metrics_snapshot():
+    with _metrics_flush_lock:
+        _metrics_flush['timer'] = None
+    write_json_atomically(metrics_path(), {histogram.name: histogram.snapshot() for histogram in HISTOGRAMS})
+
+def schedule_metrics_snapshot():
+    """Depois de cada requisição: o snapshot deste worker é regravado em até METRICS_FLUSH_SECONDS."""
+    if not METRICS_DIR:
+        return
+    with _metrics_flush_lock:
+        if _metrics_flush['timer'] is not None:
+            return
+        timer = _metrics_flush['timer'] = threading.Timer(METRICS_FLUSH_SECONDS, write_metrics_snapshot)
+    timer.daemon = True
+    timer.start()
+
+def read_metrics_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@contextmanager
+def metrics_lock(mode):
+    # archive_worker_metrics troca o arquivo do worker pelo archive.json sob LOCK_EX
+    with open(metrics_path('archive.lock'), 'a') as lock:
+        fcntl.flock(lock, mode)
+        yield
+
+def aggregated_histograms():
+    """Séries de cada histograma somadas entre todos os workers (ou só as deste, sem METRICS_DIR)."""
+    if not METRICS_DIR:
+        return {histogram.name: None for histogram in HISTOGRAMS}
+    write_metrics_snapshot()
+    merged = {histogram.name: {} for histogram in HISTOGRAMS}
+    with metrics_lock(fcntl.LOCK_SH):
+        for name in sorted(os.listdir(METRICS_DIR)):
+            if name.endswith('.json'):
+                for histogram_name, snapshot in read_metrics_file(metrics_path(name)).items():
+                    if histogram_name in merged:
+                        Histogram.merge(merged[histogram_name], snapshot)
+    return merged
+
+def archive_worker_metrics():
+    """Soma os contadores deste worker em archive.json e apaga o arquivo dele; chamar ao sair."""
+    if not METRICS_DIR:
+        return
+    with metrics_lock(fcntl.LOCK_EX):
+        archive = read_metrics_file(metrics_path(METRICS_ARCHIVE))
+        merged = {}
+        for histogram in HISTOGRAMS:
+            series = {}
+            Histogram.merge(series, archive.get(histogram.name, []))
+            Histogram.merge(series, histogram.snapshot())
+            merged[histogram.name] = [[list(labels), *values] for labels, values in series.items()]
+        write_json_atomically(metrics_path(METRICS_ARCHIVE), merged)
+        if os.path.exists(metrics_path()):
+            os.remove(metrics_path())
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mede quanto cada checkout esperou por uma conexão livre."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+def uses_queue_pool(url):
+    # SQLite em memória usa SingletonThreadPool; os demais bancos usam QueuePool
+    return bool(url) and not (url.startswith('sqlite') and (':memory:' in url or url.rstrip('/') == 'sqlite:'))
+
+# ============ JSON ============
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa o json da stdlib
+    orjson = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow só é usado pelas imagens das estampas (require_pillow)
+    Image = ImageOps = None
+
+def json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class FastJSONProvider(JSONProvider):
+    """Provider JSON com orjson e suporte nativo a Decimal, date e datetime.
+
+    Mantém o formato de saída do provider padrão em produção (chaves
+    ordenadas, sem espaços), mas datas saem em ISO 8601 e Decimal como número.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None:
+            return orjson.dumps(obj, default=json_default, option=orjson.OPT_SORT_KEYS).decode()
+        return json.dumps(obj, default=json_default, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj) + '\n', mimetype='application/json')
+
+app.json = FastJSONProvider(app)
+
 # Configuração do banco de dados
 database_url = os.environ.get('DATABASE_URL')
 if database_url and database_url.startswith('postgres://'):
@@ -30,10 +269,35 @@ if database_url and database_url.startswith('postgres://'):
 
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_recycle': 300,
-    'pool_pre_ping': True,
-}
+
+def env_number(name, default, cast=int):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+def engine_options(url):
+    """Opções do engine a partir do ambiente (gunicorn.conf.py deriva o pool)."""
+    options = {
+        'pool_recycle': 300,
+        'pool_pre_ping': True,
+    }
+    if uses_queue_pool(url):
+        options.update({
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': env_number('DB_POOL_SIZE', 5),
+            'max_overflow': env_number('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': env_number('DB_POOL_TIMEOUT', 10, float),
+        })
+    if url and url.startswith('postgresql'):
+        statement_timeout = env_number('DB_STATEMENT_TIMEOUT_MS', 30000)
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+
+if 'pool_size' in app.config['SQLALCHEMY_ENGINE_OPTIONS']:
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    print(f"[EMUNAH] DB pool: {options['pool_size']}+{options['max_overflow']} conexões, "
+          f"timeout {options['pool_timeout']}s", flush=True)
 
 db = SQLAlchemy(app)
 
@@ -62,6 +326,12 @@ class Supplier(db.Model):
     production_time_days = db.Column(db.Integer, default=7)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # filtros da listagem (?status=, ?category=) já na ordem da paginação
+        db.Index('ix_suppliers_status_id', 'status', 'id'),
+        db.Index('ix_suppliers_category_id', 'category', 'id'),
+    )
+
 class Product(db.Model):
     __tablename__ = 'products'
     id = db.Column(db.Integer, primary_key=True)
@@ -81,8 +351,11 @@ class Print(db.Model):
     name = db.Column(db.Text, nullable=False)
     technique = db.Column(db.Text)
     colors = db.Column(db.Text)
-    image_url = db.Column(db.Text)
+    image_url = db.Column(db.Text)  # URL externa, ou cópia em base64 de image_key até o armazenamento ser persistente
     image_type = db.Column(db.Text, default='url')
+    image_key = db.Column(db.Text)  # "<sha256>.<ext>" no repositório de imagens
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
     tags = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -96,9 +369,16 @@ class Quote(db.Model):
     items_summary = db.Column(db.Text)
     total_value = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.Text, default='Rascunho')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     client = db.relationship('Client', backref='quotes')
 
+    __table_args__ = (
+        db.Index('ix_quotes_created_at_id', 'created_at', 'id'),
+        # filtro por status (lista e contagem do dashboard) já ordenado para a paginação
+        db.Index('ix_quotes_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_quotes_client_id', 'client_id'),
+    )
+
 class Order(db.Model):
     __tablename__ = 'orders'
     id = db.Column(db.Integer, primary_key=True)
@@ -111,9 +391,30 @@ class Order(db.Model):
     stage = db.Column(db.Text, default='Aguardando')
     progress = db.Column(db.Integer, default=0)
     priority = db.Column(db.Text, default='Normal')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # concorrência otimista
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     client = db.relationship('Client', backref='orders')
 
+    __table_args__ = (
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        # filtro por etapa (lista e contagem "em produção") já ordenado para a paginação
+        db.Index('ix_orders_stage_created_at_id', 'stage', 'created_at', 'id'),
+        db.Index('ix_orders_client_id', 'client_id'),
+        db.Index('ix_orders_quote_id', 'quote_id'),
+    )
+
+# Ordem do quadro de produção: prioridade, entrega (sem data por último), id.
+# Valores como literais no SQL, não parâmetros, para o SQLite casar a
+# consulta com o índice de expressão ix_orders_board.
+ORDER_PRIORITY_RANKS = (('Urgente', 0), ('Alta', 1), ('Normal', 2))
+order_priority_rank = case(
+    *[(Order.priority == literal_column(f"'{name}'"), literal_column(str(rank), db.Integer()))
+      for name, rank in ORDER_PRIORITY_RANKS],
+    else_=literal_column(str(len(ORDER_PRIORITY_RANKS)), db.Integer())
+)
+order_delivery_sort = func.coalesce(Order.delivery_date, literal_column("'9999-12-31'", db.Date()))
+db.Index('ix_orders_board', Order.stage, order_priority_rank, order_delivery_sort, Order.id)
+
 class Transaction(db.Model):
     __tablename__ = 'transactions'
     id = db.Column(db.Integer, primary_key=True)
@@ -124,12 +425,1988 @@ class Transaction(db.Model):
     type = db.Column(db.Text, nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.Text, default='Pendente')
-    transaction_date = db.Column(db.Date, default=date.today)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    transaction_date = db.Column(db.Date, nullable=False, default=date.today)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_transactions_date_id', 'transaction_date', 'id'),
+        db.Index('ix_transactions_type_status_date_id', 'type', 'status', 'transaction_date', 'id'),
+        db.Index('ix_transactions_order_id', 'order_id'),
+        # receita confirmada do dashboard via index-only scan no PostgreSQL
+        db.Index(
+            'ix_transactions_confirmed_income_amount', 'amount',
+            postgresql_where=db.text("type = 'income' AND status = 'Confirmado'"),
+            sqlite_where=db.text("type = 'income' AND status = 'Confirmado'")
+        ),
+    )
+
+class DocumentCounter(db.Model):
+    __tablename__ = 'document_counters'
+    name = db.Column(db.Text, primary_key=True)  # ex.: 'COT-2025'
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    name = db.Column(db.Text, primary_key=True)  # nome da tabela
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class CashflowMonthly(db.Model):
+    """Soma das transações por mês, tipo, categoria e status (ver add_to_cashflow)."""
+    __tablename__ = 'cashflow_monthly'
+    month = db.Column(db.Date, primary_key=True)  # primeiro dia do mês
+    type = db.Column(db.Text, primary_key=True)
+    category = db.Column(db.Text, primary_key=True)  # '' quando sem categoria
+    status = db.Column(db.Text, primary_key=True)  # '' quando sem status
+    amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyStat(db.Model):
+    """Indicadores do dashboard por dia (UTC), para os gráficos (ver add_to_daily_stats)."""
+    __tablename__ = 'daily_stats'
+    day = db.Column(db.Date, primary_key=True)
+    quotes = db.Column(db.Integer, nullable=False, default=0)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    converted_orders = db.Column(db.Integer, nullable=False, default=0)  # pedidos vindos de cotação
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)  # receita confirmada
+
+class SearchEntry(db.Model):
+    """Uma linha por registro pesquisável; os índices de texto ficam em SEARCH_DDL."""
+    __tablename__ = 'search_entries'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.Text, nullable=False)  # client, product, print, order, quote
+    ref_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.Text, nullable=False)
+    subtitle = db.Column(db.Text)
+    search_text = db.Column(db.Text, nullable=False)  # minúsculo e sem acentos
+
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'ref_id', name='uq_search_entries_kind_ref_id'),
+    )
+
+# ============ INICIALIZAÇÃO DO BANCO ============
+
+# Índices de texto da busca, específicos de cada banco
+SEARCH_DDL = {
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_search_entries_trgm ON search_entries "
+        "USING gin (search_text gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_search_entries_tsv ON search_entries "
+        "USING gin (to_tsvector('simple', search_text))",
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_entries_fts USING fts5("
+        "search_text, content='search_entries', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS search_entries_ai AFTER INSERT ON search_entries BEGIN "
+        "INSERT INTO search_entries_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+        "CREATE TRIGGER IF NOT EXISTS search_entries_ad AFTER DELETE ON search_entries BEGIN "
+        "INSERT INTO search_entries_fts(search_entries_fts, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); END",
+        "CREATE TRIGGER IF NOT EXISTS search_entries_au AFTER UPDATE ON search_entries BEGIN "
+        "INSERT INTO search_entries_fts(search_entries_fts, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); "
+        "INSERT INTO search_entries_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    ],
+}
+
+def add_missing_columns(conn):
+    """ALTER TABLE ... ADD COLUMN para colunas novas de tabelas existentes.
+
+    create_all não altera tabelas; colunas novas precisam ser anuláveis ou
+    ter server_default para valer nas linhas antigas.
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            conn.execute(text(ddl))
+
+# created_at de linhas antigas sem data: vão para o fim da lista (mais recentes primeiro)
+LEGACY_TIMESTAMP = datetime(1970, 1, 1)
+# Chaves da paginação por cursor (QUOTE_ORDER, ORDER_ORDER, TRANSACTION_ORDER) e
+# o valor das linhas que estão NULL; transaction_date depois de created_at
+SORT_KEY_BACKFILL = (
+    (Quote.__table__.c.created_at, literal(LEGACY_TIMESTAMP, db.DateTime())),
+    (Order.__table__.c.created_at, literal(LEGACY_TIMESTAMP, db.DateTime())),
+    (Transaction.__table__.c.created_at, literal(LEGACY_TIMESTAMP, db.DateTime())),
+    (Transaction.__table__.c.transaction_date, func.date(Transaction.__table__.c.created_at)),
+)
+
+def backfill_sort_keys(conn):
+    """Preenche as chaves de ordenação NULL e, no PostgreSQL, trava as colunas em NOT NULL.
+
+    page_query compara tuplas (created_at, id) < (...): linha com NULL nunca
+    passa na comparação e some das páginas seguintes. No SQLite não há ALTER
+    COLUMN; tabelas antigas continuam anuláveis, mas o app sempre grava a
+    data e cada init-db preenche o que vier de fora. Devolve as linhas alteradas.
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    changed = 0
+    for column, value in SORT_KEY_BACKFILL:
+        changed += conn.execute(
+            update(column.table).where(column.is_(None)).values({column.name: value})
+        ).rowcount
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text(
+                f"ALTER TABLE {quote(column.table.name)} ALTER COLUMN {quote(column.name)} SET NOT NULL"
+            ))
+    return changed
+
+# chave do pg_advisory_lock que serializa init-db de instâncias subindo juntas
+INIT_DB_LOCK_KEY = 0x454D554E
+
+@contextmanager
+def init_db_lock():
+    """Um init-db por vez no PostgreSQL; no SQLite o próprio arquivo já serializa as escritas."""
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db.engine.connect() as conn:
+        conn.execute(select(func.pg_advisory_lock(INIT_DB_LOCK_KEY)))
+        try:
+            yield
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(INIT_DB_LOCK_KEY)))
+
+def lock_for_rebuild(model):
+    """Bloqueia escritas na tabela derivada até o commit da reconstrução.
+
+    Escritas concorrentes (index_search_records, add_to_cashflow, ...) esperam
+    o fim do rebuild e aplicam seu incremento por cima; assim nem se perdem
+    nem colidem com a unique da linha que o rebuild acabou de inserir.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(text(f'LOCK TABLE {model.__tablename__} IN SHARE ROW EXCLUSIVE MODE'))
+
+def init_db():
+    """Cria tabelas, colunas e índices que faltam. Roda uma vez por deploy (build/release), não por instância."""
+    with init_db_lock():
+        db.create_all()
+        with db.engine.begin() as conn:
+            add_missing_columns(conn)
+            backfilled = backfill_sort_keys(conn)
+        # create_all só cria índices junto com tabelas novas; IF NOT EXISTS porque
+        # a reflexão não enxerga índices de expressão (checkfirst os recriaria)
+        with db.engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            for statement in SEARCH_DDL.get(db.engine.dialect.name, []):
+                conn.execute(text(statement))
+        # Tabelas derivadas vazias (primeiro deploy com elas) ou com datas recém-preenchidas:
+        # recalcula a partir das de origem
+        for model, rebuild in ((SearchEntry, rebuild_search_index), (CashflowMonthly, rebuild_cashflow),
+                               (DailyStat, rebuild_daily_stats)):
+            if backfilled or db.session.execute(select(model).limit(1)).first() is None:
+                rebuild()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """flask --app main init-db"""
+    init_db()
+    print("[EMUNAH] Banco inicializado", flush=True)
+
+@app.cli.command('rebuild-cashflow')
+def rebuild_cashflow_command():
+    """flask --app main rebuild-cashflow"""
+    count = rebuild_cashflow()
+    print(f"[EMUNAH] Fluxo de caixa recalculado: {count} linhas", flush=True)
+
+@app.cli.command('backfill-daily-stats')
+def backfill_daily_stats_command():
+    """flask --app main backfill-daily-stats"""
+    count = rebuild_daily_stats()
+    print(f"[EMUNAH] Indicadores diários recalculados: {count} dias", flush=True)
+
+@app.cli.command('move-print-images')
+@click.option('--drop-inline', is_flag=True, help='Apaga o base64 de image_url depois de o arquivo estar no repositório')
+def move_print_images_command(drop_inline):
+    """flask --app main move-print-images [--drop-inline]"""
+    if not IMAGE_STORAGE_CONFIGURED:
+        # o padrão fica no disco da instância, que some no próximo deploy
+        raise click.ClickException('Defina IMAGE_STORAGE_PATH (volume persistente) antes de mover as imagens')
+    count = move_inline_print_images(drop_inline)
+    print(f"[EMUNAH] Imagens de estampas movidas para o repositório: {count}", flush=True)
+
+@app.cli.command('rebuild-search')
+def rebuild_search_command():
+    """flask --app main rebuild-search"""
+    count = rebuild_search_index()
+    print(f"[EMUNAH] Busca reindexada: {count} registros", flush=True)
+
+# ============ PAGINAÇÃO E FILTROS ============
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 1000
+
+def flag_arg(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def wants_full_list():
+    """Formato antigo (lista completa sem paginação) via ?all=true."""
+    return flag_arg('all')
+
+def json_array_chunk(rows, serialize):
+    return ','.join(app.json.dumps(serialize(row)) for row in rows)
+
+def streamed_json_array(query, serialize):
+    """Escreve o array JSON aos poucos, lendo as linhas com cursor no servidor.
+
+    yield_per liga stream_results (cursor nomeado no PostgreSQL), então a
+    memória do worker fica limitada a STREAM_BATCH_SIZE linhas por vez.
+    """
+    def generate():
+        yield '['
+        first = True
+        result = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for rows in result.partitions():
+            yield ('' if first else ',') + json_array_chunk(rows, serialize)
+            first = False
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def parse_limit(default=DEFAULT_PAGE_SIZE):
+    raw = request.args.get('limit')
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError('Parâmetro limit inválido')
+    if limit < 1:
+        raise ValueError('Parâmetro limit inválido')
+    return min(limit, MAX_PAGE_SIZE)
+
+def parse_date_arg(name):
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Parâmetro {name} inválido (use AAAA-MM-DD)')
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, payload):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            else:
+                value = python_type(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise ValueError('Parâmetro cursor inválido')
+
+def apply_filters(query, filters, date_column=None):
+    """Aplica filtros de igualdade (?status=A,B) e de período (?from=&to=) em SQL."""
+    for param, column in filters.items():
+        raw = request.args.get(param)
+        if not raw:
+            continue
+        try:
+            values = [column.type.python_type(v) for v in raw.split(',') if v]
+        except ValueError:
+            raise ValueError(f'Parâmetro {param} inválido')
+        if len(values) == 1:
+            query = query.filter(column == values[0])
+        else:
+            query = query.filter(column.in_(values))
+
+    if date_column is not None:
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+        is_datetime = date_column.type.python_type is datetime
+        if date_from:
+            start = datetime.combine(date_from, datetime.min.time()) if is_datetime else date_from
+            query = query.filter(date_column >= start)
+        if date_to:
+            if is_datetime:
+                query = query.filter(date_column < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+            else:
+                query = query.filter(date_column <= date_to)
+    return query
+
+def page_query(query, order_columns, descending=False, default_limit=DEFAULT_PAGE_SIZE):
+    """Ordena e limita a consulta da página; retorna (query, limit).
+
+    limit é None com ?all=true (lista completa, sem LIMIT).
+    """
+    order_by = [c.desc() for c in order_columns] if descending else list(order_columns)
+
+    if wants_full_list():
+        return query.order_by(*order_by), None
+
+    limit = parse_limit(default_limit)
+    cursor = request.args.get('cursor')
+    if cursor:
+        key = tuple_(*order_columns)
+        values = tuple_(*decode_cursor(cursor, order_columns))
+        query = query.filter(key < values if descending else key > values)
+
+    return query.order_by(*order_by).limit(limit + 1), limit
+
+def page_payload(rows, order_columns, serialize, limit):
+    if limit is None:
+        return [serialize(row) for row in rows]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(tuple(rows[-1])[-len(order_columns):])
+
+    return {
+        'items': [serialize(row) for row in rows],
+        'nextCursor': next_cursor
+    }
+
+def paginated_payload(query, order_columns, serialize, descending=False):
+    """Paginação por cursor (keyset) sobre order_columns; o último deve ser o id.
+
+    A query deve selecionar order_columns por último (ver list_query).
+
+    Retorna {'items': [...], 'nextCursor': ...}. Com ?all=true mantém o formato
+    antigo, devolvendo a lista completa.
+    """
+    query, limit = page_query(query, order_columns, descending)
+    return page_payload(db.session.execute(query).all(), order_columns, serialize, limit)
+
+def paginated_response(query, order_columns, serialize, descending=False):
+    """Como paginated_payload; ?stream=true devolve a lista completa em streaming."""
+    if flag_arg('stream'):
+        order_by = [c.desc() for c in order_columns] if descending else list(order_columns)
+        return streamed_json_array(query.order_by(*order_by), serialize)
+    return jsonify(paginated_payload(query, order_columns, serialize, descending))
+
+# ============ SERIALIZAÇÃO ============
+
+class br_date(FunctionElement):
+    """Data no formato DD/MM/AAAA formatada pelo próprio banco."""
+    type = db.Text()
+    name = 'br_date'
+    inherit_cache = True
+
+@compiles(br_date)
+def _br_date_postgresql(element, compiler, **kw):
+    return "to_char(%s, 'DD/MM/YYYY')" % compiler.process(element.clauses, **kw)
+
+@compiles(br_date, 'sqlite')
+def _br_date_sqlite(element, compiler, **kw):
+    return "strftime('%%d/%%m/%%Y', %s)" % compiler.process(element.clauses, **kw)
 
-# Criar tabelas
-with app.app_context():
-    db.create_all()
+class month_start(FunctionElement):
+    """Primeiro dia do mês da data."""
+    type = db.Date()
+    name = 'month_start'
+    inherit_cache = True
+
+@compiles(month_start)
+def _month_start_postgresql(element, compiler, **kw):
+    return "CAST(date_trunc('month', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(month_start, 'sqlite')
+def _month_start_sqlite(element, compiler, **kw):
+    return "date(%s, 'start of month')" % compiler.process(element.clauses, **kw)
+
+class day_of(FunctionElement):
+    """Data (sem hora) de um timestamp."""
+    type = db.Date()
+    name = 'day_of'
+    inherit_cache = True
+
+@compiles(day_of)
+def _day_of_postgresql(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_of, 'sqlite')
+def _day_of_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+def money(column):
+    return func.coalesce(column, 0)
+
+# Campo da API -> expressão SQL, na ordem do JSON. As conversões (valores
+# nulos, datas DD/MM/AAAA) acontecem no SELECT; Decimal e datetime seguem
+# direto para o provider JSON, então cada linha vira um único dict.
+CLIENT_FIELDS = (
+    ('id', Client.id),
+    ('name', Client.name),
+    ('contact', Client.contact),
+    ('email', Client.email),
+    ('phone', Client.phone),
+    ('address', Client.address),
+    ('createdAt', Client.created_at),
+)
+
+SUPPLIER_FIELDS = (
+    ('id', Supplier.id),
+    ('name', Supplier.name),
+    ('contact', Supplier.contact),
+    ('email', Supplier.email),
+    ('phone', Supplier.phone),
+    ('category', Supplier.category),
+    ('status', Supplier.status),
+    ('rating', Supplier.rating),
+    ('productionTimeDays', Supplier.production_time_days),
+)
+
+PRODUCT_FIELDS = (
+    ('id', Product.id),
+    ('name', Product.name),
+    ('sku', Product.sku),
+    ('category', Product.category),
+    ('price', money(Product.price)),
+    ('cost', money(Product.cost)),
+    ('stock', Product.stock),
+    ('colors', Product.colors),
+    ('sizes', Product.sizes),
+)
+
+IMAGE_URL_PREFIX = '/api/images/'
+
+# Imagem no repositório: o JSON leva só a URL e as dimensões, nunca o arquivo
+PRINT_FIELDS = (
+    ('id', Print.id),
+    ('name', Print.name),
+    ('technique', Print.technique),
+    ('colors', Print.colors),
+    ('imageUrl', case((Print.image_key.isnot(None), literal(IMAGE_URL_PREFIX) + Print.image_key), else_=Print.image_url)),
+    ('imageType', Print.image_type),
+    ('thumbnailUrl', case((Print.image_key.isnot(None), literal(IMAGE_URL_PREFIX) + Print.image_key + '/thumb'))),
+    ('imageWidth', Print.image_width),
+    ('imageHeight', Print.image_height),
+    ('tags', Print.tags),
+)
+
+# Cotação sem cliente cadastrado mostra o lead
+QUOTE_FIELDS = (
+    ('id', Quote.id),
+    ('quoteNumber', Quote.quote_number),
+    ('clientId', Quote.client_id),
+    ('clientName', case((Client.id.isnot(None), Client.name), else_=Quote.lead_name)),
+    ('contact', case((Client.id.isnot(None), Client.contact), else_=Quote.lead_contact)),
+    ('itemsSummary', Quote.items_summary),
+    ('totalValue', money(Quote.total_value)),
+    ('status', Quote.status),
+    ('date', func.coalesce(br_date(Quote.created_at), '')),
+)
+
+ORDER_FIELDS = (
+    ('id', Order.id),
+    ('orderNumber', Order.order_number),
+    ('clientName', func.coalesce(Client.name, '')),
+    ('itemsSummary', Order.items_summary),
+    ('totalValue', money(Order.total_value)),
+    ('deliveryDate', br_date(Order.delivery_date)),
+    ('stage', Order.stage),
+    ('progress', Order.progress),
+    ('priority', Order.priority),
+    ('version', Order.version),
+)
+
+TRANSACTION_FIELDS = (
+    ('id', Transaction.id),
+    ('transactionNumber', Transaction.transaction_number),
+    ('description', Transaction.description),
+    ('category', Transaction.category),
+    ('type', Transaction.type),
+    ('amount', money(Transaction.amount)),
+    ('status', Transaction.status),
+    ('date', func.coalesce(br_date(Transaction.transaction_date), '')),
+)
+
+def row_serializer(fields):
+    names = tuple(name for name, _ in fields)
+    # zip para nos nomes: as colunas de cursor no fim da linha ficam de fora
+    return lambda row: dict(zip(names, row))
+
+# Registro único campo da API -> coluna por modelo, usado por ?fields=
+FIELD_REGISTRY = {
+    Client: CLIENT_FIELDS,
+    Supplier: SUPPLIER_FIELDS,
+    Product: PRODUCT_FIELDS,
+    Print: PRINT_FIELDS,
+    Quote: QUOTE_FIELDS,
+    Order: ORDER_FIELDS,
+    Transaction: TRANSACTION_FIELDS,
+}
+
+def requested_fields(model):
+    """Campos de ?fields=id,name,price na ordem do registro; sem o parâmetro, todos.
+
+    Só os campos pedidos entram no SELECT (colunas JSON como colors/tags
+    ficam no banco quando não são pedidas).
+    """
+    fields = FIELD_REGISTRY[model]
+    raw = request.args.get('fields')
+    if not raw:
+        return fields
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = names - {name for name, _ in fields}
+    if unknown:
+        raise ValueError(f"Parâmetro fields inválido: {', '.join(sorted(unknown))}")
+    if not names:
+        raise ValueError('Parâmetro fields inválido')
+    return tuple((name, expr) for name, expr in fields if name in names)
+
+# ============ CONSULTAS DE LISTAGEM ============
+
+CLIENT_ORDER = (Client.id,)
+SUPPLIER_ORDER = (Supplier.id,)
+PRODUCT_ORDER = (Product.id,)
+PRINT_ORDER = (Print.id,)
+QUOTE_ORDER = (Quote.created_at, Quote.id)
+ORDER_ORDER = (Order.created_at, Order.id)
+BOARD_ORDER = (order_priority_rank, order_delivery_sort, Order.id)
+TRANSACTION_ORDER = (Transaction.transaction_date, Transaction.id)
+
+def list_query(model, fields, order_columns):
+    """SELECT só das colunas do JSON, com as colunas do cursor no fim da linha."""
+    columns = [expr.label(name) for name, expr in fields]
+    columns += [column.label(f'_cursor_{i}') for i, column in enumerate(order_columns)]
+    return select(*columns).select_from(model)
+
+# Campos que leem a tabela clients; sem nenhum deles em ?fields= o JOIN fica de fora
+CLIENT_JOIN_FIELDS = {'clientName', 'contact'}
+
+def join_client(query, fields, client_id):
+    if CLIENT_JOIN_FIELDS.isdisjoint(name for name, _ in fields):
+        return query
+    return query.outerjoin(Client, client_id == Client.id)
+
+def quote_list_query(fields=QUOTE_FIELDS):
+    """Cotações com o cliente em um único SELECT (sem lazy load por linha)."""
+    return join_client(list_query(Quote, fields, QUOTE_ORDER), fields, Quote.client_id)
+
+def order_list_query(order_columns=ORDER_ORDER, fields=ORDER_FIELDS):
+    """Pedidos com o nome do cliente em um único SELECT (sem lazy load por linha)."""
+    return join_client(list_query(Order, fields, order_columns), fields, Order.client_id)
+
+# Filtros de igualdade das listagens (?status=A,B); a exportação usa os mesmos
+QUOTE_FILTERS = {'status': Quote.status, 'clientId': Quote.client_id}
+ORDER_FILTERS = {'stage': Order.stage, 'priority': Order.priority, 'clientId': Order.client_id}
+TRANSACTION_FILTERS = {'type': Transaction.type, 'status': Transaction.status, 'category': Transaction.category}
+
+# ============ NUMERAÇÃO DE DOCUMENTOS ============
+
+QUOTE_PREFIX = ('COT', 3)
+ORDER_PREFIX = ('PED', 4)
+TRANSACTION_PREFIX = ('TRX', 5)
+
+def dialect_insert(model):
+    # insert com on_conflict_do_update do banco em uso
+    insert = sqlite_insert if db.session.get_bind().dialect.name == 'sqlite' else pg_insert
+    return insert(model)
+
+def increment_counter(model, name, step=1):
+    """INSERT ... ON CONFLICT DO UPDATE ... RETURNING em um único comando.
+
+    Roda dentro da transação da sessão: o lock da linha vale até o commit,
+    então workers concorrentes se serializam nela e um rollback desfaz o
+    incremento. Retorna o novo valor.
+    """
+    stmt = dialect_insert(model).values(name=name, value=step)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.name],
+        set_={'value': model.value + step}
+    ).returning(model.value)
+    return db.session.execute(stmt).scalar_one()
+
+def allocate_document_numbers(prefix, count=1):
+    """Reserva `count` números consecutivos para o prefixo no ano corrente."""
+    code, width = prefix
+    name = f"{code}-{date.today().year}"
+    last = increment_counter(DocumentCounter, name, count)
+    return [f"{name}-{str(n).zfill(width)}" for n in range(last - count + 1, last + 1)]
+
+def allocate_document_number(prefix):
+    return allocate_document_numbers(prefix)[0]
+
+# ============ VERSÕES DE TABELA E ETAGS ============
+
+def bump_table_version(*names):
+    """Marca as tabelas como alteradas; chamar antes do commit da escrita."""
+    for name in names:
+        increment_counter(TableVersion, name)
+
+def current_table_versions(names):
+    # Lidas uma vez por requisição; etag_for e o cache de referência reaproveitam
+    known = g.setdefault('table_versions', {})
+    missing = [name for name in names if name not in known]
+    if missing:
+        rows = db.session.execute(
+            select(TableVersion.name, TableVersion.value).where(TableVersion.name.in_(missing))
+        ).all()
+        found = dict(rows)
+        for name in missing:
+            known[name] = found.get(name, 0)
+    return [known[name] for name in names]
+
+def table_etag(names, versions):
+    key = f"{request.path}?{request.query_string.decode()}|" + ','.join(
+        f"{name}:{version}" for name, version in zip(names, versions)
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def etag_for(*names):
+    """ETag forte a partir das versões das tabelas lidas pela rota.
+
+    Se o If-None-Match bate, responde 304 sem executar a rota (só uma leitura
+    em table_versions). A query string entra no hash porque filtros e cursor
+    mudam o corpo.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = table_etag(names, current_table_versions(names))
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+# ============ CACHE DE DADOS DE REFERÊNCIA ============
+
+REFERENCE_CACHE_SIZE = int(os.environ.get('REFERENCE_CACHE_SIZE', 256))
+REFERENCE_CACHE_TTL = float(os.environ.get('REFERENCE_CACHE_TTL', 300))
+
+class ReferenceCache:
+    """LRU com TTL para produtos, fornecedores e estampas.
+
+    Cada entrada guarda a versão da tabela (table_versions) de quando foi
+    preenchida; uma escrita em qualquer worker incrementa a versão e invalida
+    as entradas dos demais na próxima leitura.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, value):
+        with self.lock:
+            self.entries[key] = (version, time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table):
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == table]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl
+            }
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL)
+
+def cached_list_response(table, build_query, order_columns, serialize):
+    """Lista de dados de referência servida do cache; streaming não passa por ele."""
+    if flag_arg('stream'):
+        return paginated_response(build_query(), order_columns, serialize)
+    key = (table, tuple(sorted(request.args.items(multi=True))))
+    version = current_table_versions([table])[0]
+    body = reference_cache.get(key, version)
+    if body is None:
+        body = paginated_payload(build_query(), order_columns, serialize)
+        reference_cache.put(key, version, body)
+    return jsonify(body)
+
+# ============ BUSCA ============
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+# tipo -> (modelo, coluna do título, coluna do subtítulo, colunas pesquisáveis)
+SEARCH_SOURCES = {
+    'client': (Client, 'name', 'email', ('name', 'email', 'phone')),
+    'product': (Product, 'name', 'sku', ('name', 'sku')),
+    'print': (Print, 'name', 'technique', ('name', 'tags')),
+    'order': (Order, 'order_number', 'items_summary', ('order_number',)),
+    'quote': (Quote, 'quote_number', 'items_summary', ('quote_number', 'lead_name')),
+}
+SEARCH_KINDS = {model: kind for kind, (model, _, _, _) in SEARCH_SOURCES.items()}
+
+def search_normalize(value):
+    """Minúsculo e sem acentos ("Sublimação" -> "sublimacao"), igual na escrita e na busca."""
+    if isinstance(value, list):
+        value = ' '.join(str(v) for v in value)
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+def search_entry(kind, values):
+    """Linha de search_entries a partir de um dict coluna -> valor (com o id)."""
+    _, title, subtitle, columns = SEARCH_SOURCES[kind]
+    return {
+        'kind': kind,
+        'ref_id': values['id'],
+        'title': values[title] or '',
+        'subtitle': values[subtitle],
+        'search_text': ' '.join(search_normalize(values[c]) for c in columns if values[c])
+    }
+
+def index_search_records(kind, rows):
+    if rows:
+        db.session.execute(SearchEntry.__table__.insert(), [search_entry(kind, row) for row in rows])
+
+def index_search_record(kind, record):
+    """Indexa um objeto recém-criado; chamar antes do commit."""
+    db.session.flush()
+    _, title, subtitle, columns = SEARCH_SOURCES[kind]
+    names = {'id', title, subtitle, *columns}
+    index_search_records(kind, [{name: getattr(record, name) for name in names}])
+
+def rebuild_search_index():
+    """Recria search_entries a partir das tabelas de origem; retorna quantos registros."""
+    lock_for_rebuild(SearchEntry)
+    db.session.execute(SearchEntry.__table__.delete())
+    count = 0
+    for kind, (model, title, subtitle, columns) in SEARCH_SOURCES.items():
+        names = ['id', title, subtitle, *[c for c in columns if c not in (title, subtitle)]]
+        query = select(*[getattr(model, name) for name in names]).execution_options(yield_per=BULK_CHUNK_SIZE)
+        for rows in db.session.execute(query).partitions():
+            index_search_records(kind, [row._asdict() for row in rows])
+            count += len(rows)
+    db.session.commit()
+    return count
+
+def search_query(tokens, kinds, limit):
+    """Busca ranqueada; cada termo casa por prefixo e todos precisam casar."""
+    columns = (SearchEntry.kind, SearchEntry.ref_id, SearchEntry.title, SearchEntry.subtitle)
+    dialect = db.engine.dialect.name
+
+    if dialect == 'postgresql':
+        # tsvector para prefixos + trigramas para erros de digitação
+        # config literal (não parâmetro) para casar com o índice de expressão
+        config = literal_column("'simple'")
+        tsquery = func.to_tsquery(config, ' & '.join(f'{token}:*' for token in tokens))
+        tsvector = func.to_tsvector(config, SearchEntry.search_text)
+        phrase = ' '.join(tokens)
+        rank = func.ts_rank(tsvector, tsquery) + func.similarity(SearchEntry.search_text, phrase)
+        query = select(*columns).where(or_(tsvector.op('@@')(tsquery), SearchEntry.search_text.op('%')(phrase)))
+    elif dialect == 'sqlite':
+        fts = sql.table('search_entries_fts', sql.column('rowid'), sql.column('rank'))
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        # rank do FTS5 é o bm25: menor é melhor
+        rank = -fts.c.rank
+        query = select(*columns).join(fts, fts.c.rowid == SearchEntry.id).where(
+            literal_column('search_entries_fts').op('MATCH')(match)
+        )
+    else:
+        rank = literal_column('0')
+        query = select(*columns)
+        for token in tokens:
+            query = query.where(SearchEntry.search_text.contains(token))
+
+    if kinds:
+        query = query.where(SearchEntry.kind.in_(kinds))
+    return query.order_by(rank.desc(), SearchEntry.id).limit(limit)
+
+# ============ IMAGENS DAS ESTAMPAS ============
+
+# Em produção, monte um volume persistente e aponte IMAGE_STORAGE_PATH para ele;
+# o padrão dentro do projeto some a cada deploy (autoscale, nixpacks)
+IMAGE_STORAGE = os.environ.get('IMAGE_STORAGE_PATH', os.path.join(basedir, 'storage', 'images'))
+IMAGE_STORAGE_CONFIGURED = bool(os.environ.get('IMAGE_STORAGE_PATH'))
+IS_PRODUCTION = os.environ.get('REPLIT_DEPLOYMENT') == '1' or os.environ.get('NODE_ENV') == 'production'
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+# formato do Pillow -> (extensão, mimetype)
+IMAGE_FORMATS = {
+    'PNG': ('png', 'image/png'),
+    'JPEG': ('jpg', 'image/jpeg'),
+    'WEBP': ('webp', 'image/webp'),
+    'GIF': ('gif', 'image/gif'),
+}
+IMAGE_MIMETYPES = dict(IMAGE_FORMATS.values())
+IMAGE_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|jpg|webp|gif)$')
+DATA_URI_PATTERN = re.compile(r'^data:image/[\w.+-]+;base64,', re.IGNORECASE)
+# larguras aceitas em /thumb: limita quantas variantes cada imagem pode ter no disco
+THUMBNAIL_WIDTHS = (160, 320, 640)
+THUMBNAIL_DEFAULT_WIDTH = 320
+# tag Orientation do EXIF e os valores que giram a imagem 90°
+EXIF_ORIENTATION = 0x0112
+EXIF_ROTATED = {5, 6, 7, 8}
+IMAGE_MIGRATION_BATCH = 100
+
+def image_path(key):
+    return os.path.join(IMAGE_STORAGE, key[:2], key)
+
+def thumbnail_path(key, width):
+    digest, ext = key.split('.')
+    return os.path.join(IMAGE_STORAGE, 'thumbs', key[:2], f'{digest}-{width}.{ext}')
+
+def write_atomically(path, write):
+    """Escreve em um temporário e renomeia: ninguém lê arquivo pela metade.
+
+    Dois workers gerando o mesmo arquivo ao mesmo tempo produzem o mesmo
+    conteúdo; o último rename vence.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def require_pillow():
+    if Image is None:
+        raise RuntimeError('Pillow não instalado (pip install pillow)')
+
+def image_info(fp):
+    """(formato, largura, altura) lendo só o cabeçalho; largura/altura já com a rotação EXIF."""
+    require_pillow()
+    try:
+        # verify() precisa vir logo depois de abrir e inutiliza o objeto: abre duas vezes
+        with Image.open(fp) as image:
+            image.verify()
+        if hasattr(fp, 'seek'):
+            fp.seek(0)
+        with Image.open(fp) as image:
+            image_format, (width, height) = image.format, image.size
+            if image.getexif().get(EXIF_ORIENTATION) in EXIF_ROTATED:
+                width, height = height, width
+    except Exception:
+        raise ValueError('Arquivo de imagem inválido')
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError('Formato não suportado: use PNG, JPEG, WebP ou GIF')
+    return image_format, width, height
+
+def store_image(data):
+    """Guarda a imagem pelo sha256 do conteúdo; retorna (chave, largura, altura).
+
+    O mesmo arquivo enviado duas vezes ocupa o disco uma vez só.
+    """
+    if len(data) > IMAGE_MAX_BYTES:
+        raise ValueError(f'Imagem maior que {IMAGE_MAX_BYTES // (1024 * 1024)} MB')
+    image_format, width, height = image_info(io.BytesIO(data))
+    key = f"{hashlib.sha256(data).hexdigest()}.{IMAGE_FORMATS[image_format][0]}"
+    path = image_path(key)
+    if not os.path.exists(path):
+        write_atomically(path, lambda f: f.write(data))
+    return key, width, height
+
+def print_image_columns(data, keep_inline=None):
+    """Colunas de imagem de uma estampa a partir de imageUrl/imageKey da API.
+
+    Data URI (base64) é gravado no repositório; URL ou chave devolvida por
+    /api/prints/upload aponta para um arquivo que já está lá. Qualquer outra
+    URL continua externa. Sem IMAGE_STORAGE_PATH (disco que pode sumir) o
+    data URI continua em image_url, e restore_image recria o arquivo a partir
+    dele.
+    """
+    if keep_inline is None:
+        keep_inline = not IMAGE_STORAGE_CONFIGURED
+    url, key = data.get('imageUrl'), data.get('imageKey')
+    if url and DATA_URI_PATTERN.match(url):
+        try:
+            raw = base64.b64decode(url.split(',', 1)[1], validate=True)
+        except ValueError:
+            raise ValueError('Imagem em base64 inválida')
+        key, width, height = store_image(raw)
+        inline = url if keep_inline else None
+    else:
+        if not key and url and url.startswith(IMAGE_URL_PREFIX):
+            key = url[len(IMAGE_URL_PREFIX):]
+        if not key:
+            return {'image_url': url, 'image_type': data.get('imageType', 'url')}
+        if not IMAGE_KEY_PATTERN.match(key) or not os.path.exists(image_path(key)):
+            raise ValueError('Imagem não encontrada: envie o arquivo em /api/prints/upload')
+        _, width, height = image_info(image_path(key))
+        inline = None
+    return {'image_url': inline, 'image_type': 'blob', 'image_key': key, 'image_width': width, 'image_height': height}
+
+def restore_image(key):
+    """True se o arquivo da chave existe, recriando-o do data URI guardado na estampa se preciso."""
+    if not IMAGE_KEY_PATTERN.match(key):
+        return False
+    if os.path.exists(image_path(key)):
+        return True
+    url = db.session.execute(
+        select(Print.image_url).where(Print.image_key == key, Print.image_url.like('data:%')).limit(1)
+    ).scalar()
+    if url is None:
+        return False
+    store_image(base64.b64decode(url.split(',', 1)[1]))
+    return True
+
+def thumbnail_file(key, width):
+    """Caminho da miniatura (cabe em width x width); gerada só no primeiro pedido."""
+    path = thumbnail_path(key, width)
+    if os.path.exists(path):
+        return path
+    require_pillow()
+    with Image.open(image_path(key)) as original:
+        image_format = original.format
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((width, width))
+        options = {}
+        if image_format == 'JPEG':
+            image = image.convert('RGB')
+            options = {'quality': 85, 'optimize': True}
+        elif image_format == 'PNG':
+            options = {'optimize': True}
+        write_atomically(path, lambda f: image.save(f, image_format, **options))
+    return path
+
+def send_image(path, etag, mimetype):
+    # URL muda junto com o conteúdo (hash), então o navegador guarda para sempre
+    response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    return response
+
+def move_inline_print_images(drop_inline=False):
+    """Leva imagens base64 de prints.image_url para o repositório; retorna quantas.
+
+    Só pelo comando move-print-images, nunca no init-db. Sem drop_inline o
+    data URI fica em image_url (cópia de segurança); com drop_inline ele sai
+    das estampas cujo arquivo já está no repositório. Imagens inválidas ficam
+    como estão e aparecem no log.
+    """
+    moved, last_id = 0, 0
+    pending = Print.image_url.like('data:%')
+    if not drop_inline:
+        pending = pending & Print.image_key.is_(None)
+    while True:
+        rows = db.session.execute(
+            select(Print.id, Print.image_url)
+            .where(Print.id > last_id, pending)
+            .order_by(Print.id)
+            .limit(IMAGE_MIGRATION_BATCH)
+        ).all()
+        if not rows:
+            break
+        for print_id, url in rows:
+            try:
+                values = print_image_columns({'imageUrl': url}, keep_inline=not drop_inline)
+            except ValueError as e:
+                print(f"[EMUNAH] Estampa {print_id}: imagem não movida ({e})", flush=True)
+                continue
+            db.session.execute(
+                update(Print).where(Print.id == print_id).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            moved += 1
+        last_id = rows[-1].id
+        db.session.commit()
+    if moved:
+        bump_table_version('prints')
+        db.session.commit()
+        reference_cache.invalidate('prints')
+    return moved
+
+# ============ IMPORTAÇÃO EM LOTE ============
+
+BULK_MAX_ROWS = 50000
+BULK_CHUNK_SIZE = 1000
+
+def bulk_text(value):
+    value = str(value).strip() if value is not None else ''
+    return value or None
+
+# limites das colunas: Integer (32 bits) e Numeric(10, 2)
+BULK_INT_LIMIT = 2 ** 31
+BULK_DECIMAL_LIMIT = Decimal('100000000')
+CENTS = Decimal('0.01')
+
+def bulk_int(value):
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError('número inteiro inválido')
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError('número inteiro inválido')
+    if abs(number) >= BULK_INT_LIMIT:
+        raise ValueError('número fora do intervalo permitido')
+    return int(number)
+
+def bulk_decimal(value):
+    try:
+        number = Decimal(str(value).strip().replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError('número inválido')
+    # Decimal aceita "NaN" e "Infinity"; o banco não
+    if not number.is_finite():
+        raise ValueError('número inválido')
+    if abs(number) >= BULK_DECIMAL_LIMIT:
+        raise ValueError('valor acima do máximo de 99.999.999,99')
+    return number.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def bulk_date(value):
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('data inválida (use AAAA-MM-DD)')
+
+def bulk_list(value):
+    # JSON manda lista; no CSV os itens vêm separados por "|" (ex.: "P|M|G")
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split('|') if v.strip()]
+
+def bulk_transaction_type(value):
+    if value not in ('income', 'expense'):
+        raise ValueError("use 'income' ou 'expense'")
+    return value
+
+# campo da API -> (coluna, conversor, obrigatório, padrão)
+BULK_FIELDS = {
+    'clients': {
+        'name': ('name', bulk_text, True, None),
+        'contact': ('contact', bulk_text, False, None),
+        'email': ('email', bulk_text, False, None),
+        'phone': ('phone', bulk_text, False, None),
+        'address': ('address', bulk_text, False, None),
+    },
+    'products': {
+        'name': ('name', bulk_text, True, None),
+        'sku': ('sku', bulk_text, True, None),
+        'category': ('category', bulk_text, False, None),
+        'price': ('price', bulk_decimal, True, None),
+        'cost': ('cost', bulk_decimal, True, None),
+        'stock': ('stock', bulk_int, False, 0),
+        'colors': ('colors', bulk_list, False, None),
+        'sizes': ('sizes', bulk_list, False, None),
+    },
+    'transactions': {
+        'orderId': ('order_id', bulk_int, False, None),
+        'description': ('description', bulk_text, True, None),
+        'category': ('category', bulk_text, False, None),
+        'type': ('type', bulk_transaction_type, True, None),
+        'amount': ('amount', bulk_decimal, True, None),
+        'status': ('status', bulk_text, False, 'Pendente'),
+        'transactionDate': ('transaction_date', bulk_date, False, None),
+    },
+}
+
+def read_bulk_csv(raw):
+    # utf-8-sig: planilhas (e a nossa exportação) gravam o BOM no começo do arquivo
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValueError('O CSV deve estar em UTF-8')
+    return list(csv.DictReader(io.StringIO(text)))
+
+def read_bulk_payload():
+    """Aceita um array JSON, um corpo text/csv ou um arquivo CSV em multipart (campo file)."""
+    if 'file' in request.files:
+        return read_bulk_csv(request.files['file'].read())
+    if request.mimetype == 'text/csv':
+        return read_bulk_csv(request.get_data())
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Envie um array JSON ou um CSV')
+    return data
+
+def validate_bulk_rows(fields, payload):
+    rows, errors = [], []
+    for index, item in enumerate(payload, start=1):
+        if not isinstance(item, dict):
+            errors.append({'row': index, 'errors': {'_': 'linha deve ser um objeto'}})
+            continue
+        row, row_errors = {}, {}
+        # coluna fora de BULK_FIELDS é erro, não é ignorada (ex.: id ou createdAt de uma exportação)
+        for field, value in item.items():
+            if field is None:
+                row_errors['_'] = 'linha com mais colunas que o cabeçalho'
+            elif field not in fields and (field != '' or value not in (None, '')):
+                row_errors[field] = 'coluna desconhecida'
+        for field, (column, convert, required, default) in fields.items():
+            raw = item.get(field)
+            if raw is None or raw == '':
+                if required:
+                    row_errors[field] = 'obrigatório'
+                else:
+                    row[column] = default
+                continue
+            try:
+                value = convert(raw)
+            except ValueError as e:
+                # os conversores só levantam ValueError com mensagem própria
+                row_errors[field] = str(e)
+                continue
+            except (TypeError, ArithmeticError):
+                row_errors[field] = 'valor inválido'
+                continue
+            if value is None and required:
+                row_errors[field] = 'obrigatório'
+            row[column] = value
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            rows.append((index, row))
+    return rows, errors
+
+def check_duplicate_skus(rows, errors):
+    seen = {}
+    for index, row in rows:
+        seen.setdefault(row['sku'], []).append(index)
+    existing = set(db.session.execute(
+        select(Product.sku).where(Product.sku.in_(list(seen)))
+    ).scalars()) if seen else set()
+    for sku, indexes in seen.items():
+        if sku in existing or len(indexes) > 1:
+            for index in indexes:
+                errors.append({'row': index, 'errors': {'sku': 'SKU duplicado'}})
+
+# recurso -> coluna -> (campo da API, modelo referenciado)
+BULK_REFERENCES = {
+    'transactions': {'order_id': ('orderId', Order)},
+}
+
+def check_references(resource, rows, errors):
+    """Chaves estrangeiras inexistentes viram erro da linha, com um IN por lote."""
+    for column, (field, model) in BULK_REFERENCES.get(resource, {}).items():
+        wanted = sorted({row[column] for _, row in rows if row[column] is not None})
+        existing = set()
+        for start in range(0, len(wanted), BULK_CHUNK_SIZE):
+            existing.update(db.session.execute(
+                select(model.id).where(model.id.in_(wanted[start:start + BULK_CHUNK_SIZE]))
+            ).scalars())
+        for index, row in rows:
+            if row[column] is not None and row[column] not in existing:
+                errors.append({'row': index, 'errors': {field: 'registro não encontrado'}})
+
+def bulk_import(resource, model):
+    payload = read_bulk_payload()
+    if len(payload) > BULK_MAX_ROWS:
+        raise ValueError(f'Máximo de {BULK_MAX_ROWS} linhas por importação')
+
+    indexed_rows, errors = validate_bulk_rows(BULK_FIELDS[resource], payload)
+    if resource == 'products':
+        check_duplicate_skus(indexed_rows, errors)
+    check_references(resource, indexed_rows, errors)
+    if errors:
+        errors.sort(key=lambda e: e['row'])
+        return jsonify({'error': 'Validation failed', 'errors': errors}), 400
+
+    rows = [row for _, row in indexed_rows]
+
+    if resource == 'transactions' and rows:
+        numbers = allocate_document_numbers(TRANSACTION_PREFIX, len(rows))
+        today = date.today()
+        for row, number in zip(rows, numbers):
+            row['transaction_number'] = number
+            row['transaction_date'] = row['transaction_date'] or today
+        add_to_cashflow(rows)
+        add_revenue_to_daily_stats(rows)
+
+    kind = SEARCH_KINDS.get(model)
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        if kind:
+            ids = db.session.execute(
+                model.__table__.insert().returning(model.id, sort_by_parameter_order=True), chunk
+            ).scalars().all()
+            index_search_records(kind, [{**row, 'id': id_} for row, id_ in zip(chunk, ids)])
+        else:
+            db.session.execute(model.__table__.insert(), chunk)
+    bump_table_version(resource)
+    db.session.commit()
+    return jsonify({'inserted': len(rows), 'message': f'{len(rows)} registros importados com sucesso'}), 201
+
+# ============ EXPORTAÇÃO ============
+
+# recurso -> (modelo, consulta da listagem a partir dos campos, ordem, filtros, coluna de data)
+EXPORT_SOURCES = {
+    'transactions': (Transaction, lambda fields: list_query(Transaction, fields, TRANSACTION_ORDER),
+                     TRANSACTION_ORDER, TRANSACTION_FILTERS, Transaction.transaction_date),
+    'orders': (Order, lambda fields: order_list_query(fields=fields), ORDER_ORDER, ORDER_FILTERS, Order.created_at),
+    'quotes': (Quote, quote_list_query, QUOTE_ORDER, QUOTE_FILTERS, Quote.created_at),
+}
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+XLSX_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+XLSX_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+XLSX_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+# caracteres de controle que o XML não aceita
+XML_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def export_query(resource):
+    """Consulta da listagem com os filtros da requisição, em ordem cronológica.
+
+    Monta (e valida ?status=, ?from=...) antes de a resposta começar: depois
+    do primeiro chunk já não dá para responder 400.
+    """
+    model, build_query, order_columns, filters, date_column = EXPORT_SOURCES[resource]
+    fields = requested_fields(model)
+    return fields, apply_filters(build_query(fields), filters, date_column).order_by(*order_columns)
+
+def export_partitions(query, width):
+    """Lotes de linhas com cursor no servidor, sem as colunas do cursor da paginação."""
+    result = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    for rows in result.partitions():
+        yield [tuple(row)[:width] for row in rows]
+
+# texto que o Excel interpretaria como fórmula (injeção de fórmula em CSV)
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def csv_safe(value):
+    # só texto digitado pelo usuário; números e datas saem como estão
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_chunks(resource, query, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: o Excel abre como UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(name for name, _ in fields)
+    for rows in export_partitions(query, len(fields)):
+        writer.writerows([csv_safe(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+class ZipStream(io.RawIOBase):
+    """Destino sem seek para o zipfile: o que ele escreve fica aqui até drain()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    # texto sempre como inlineStr: "=..." fica como texto, nunca vira fórmula
+    text = xml_escape(XML_INVALID_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+def xlsx_parts(sheet_name):
+    """Partes fixas de uma planilha de uma aba (sem estilos nem sharedStrings)."""
+    return {
+        '[Content_Types].xml': XML_HEADER + (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': XML_HEADER + (
+            f'<Relationships xmlns="{XLSX_PACKAGE_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': XML_HEADER + (
+            f'<workbook xmlns="{XLSX_MAIN_NS}" xmlns:r="{XLSX_REL_NS}">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': XML_HEADER + (
+            f'<Relationships xmlns="{XLSX_PACKAGE_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{XLSX_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+    }
+
+def xlsx_chunks(resource, query, fields):
+    """XLSX escrito em streaming: o zip vai para a resposta à medida que é comprimido.
+
+    Sem seek, o zipfile grava tamanhos e CRC depois de cada parte (data
+    descriptor); a aba fica limitada a 4 GB sem compressão.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as book:
+        for name, content in xlsx_parts(resource).items():
+            book.writestr(name, content)
+        with book.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(f'{XML_HEADER}<worksheet xmlns="{XLSX_MAIN_NS}"><sheetData>'.encode())
+            sheet.write(xlsx_row(name for name, _ in fields).encode())
+            for rows in export_partitions(query, len(fields)):
+                sheet.write(''.join(xlsx_row(row) for row in rows).encode())
+                data = stream.drain()
+                if data:
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield stream.drain()
+
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'xlsx': (xlsx_chunks, XLSX_MIMETYPE),
+}
+
+# ============ DASHBOARD ============
+
+PRODUCTION_STAGES = ['Corte', 'Estampa', 'Costura', 'Acabamento']
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 10))
+
+# tabelas lidas pelos indicadores; o cache e o ETag usam as mesmas versões
+DASHBOARD_TABLES = ('transactions', 'quotes', 'orders', 'clients')
+
+_dashboard_cache = {'stats': None, 'versions': None, 'computed_at': 0.0}
+_dashboard_lock = threading.Lock()
+
+def dashboard_queries():
+    """Os quatro indicadores, independentes entre si (o caminho async roda em paralelo)."""
+    return (
+        select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+            Transaction.type == 'income', Transaction.status == 'Confirmado'
+        ),
+        select(func.count(Quote.id)).where(Quote.status == 'Pendente'),
+        select(func.count(Order.id)).where(Order.stage.in_(PRODUCTION_STAGES)),
+        select(func.count(Client.id)),
+    )
+
+def dashboard_payload(values):
+    revenue, pending_quotes, in_production, total_clients = values
+    return {
+        'totalRevenue': float(revenue) if revenue else 0,
+        'pendingQuotes': pending_quotes,
+        'ordersInProduction': in_production,
+        'totalClients': total_clients
+    }
+
+def compute_dashboard_stats():
+    """Os quatro indicadores em um único SELECT com subconsultas escalares."""
+    subqueries = [query.scalar_subquery() for query in dashboard_queries()]
+    return dashboard_payload(db.session.execute(select(*subqueries)).one())
+
+def cached_dashboard_stats(versions):
+    """(indicadores, momento do cálculo) em cache para estas versões das tabelas, ou (None, None).
+
+    Como no ReferenceCache, a versão de table_versions faz parte da chave: uma
+    escrita em qualquer worker invalida o cache dos demais, e o corpo servido
+    nunca é mais antigo que o ETag (as versões são lidas antes do cálculo).
+    """
+    with _dashboard_lock:
+        if (_dashboard_cache['stats'] is not None and _dashboard_cache['versions'] == versions
+                and time.monotonic() - _dashboard_cache['computed_at'] < DASHBOARD_CACHE_TTL):
+            return _dashboard_cache['stats'], _dashboard_cache['computed_at']
+        return None, None
+
+def store_dashboard_stats(versions, stats):
+    with _dashboard_lock:
+        _dashboard_cache.update(stats=stats, versions=versions, computed_at=time.monotonic())
+
+def get_cached_dashboard_stats():
+    """Retorna (stats, momento do cálculo); momento None quando acabou de ser calculado."""
+    versions = tuple(current_table_versions(DASHBOARD_TABLES))
+    stats, computed_at = cached_dashboard_stats(versions)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        store_dashboard_stats(versions, stats)
+    return stats, computed_at
+
+def dashboard_response(stats, computed_at):
+    # Cache e idade vão em cabeçalhos: o corpo (e o ETag) não muda entre acertos
+    response = jsonify(stats)
+    response.headers['X-Cache'] = 'MISS' if computed_at is None else 'HIT'
+    response.headers['Age'] = str(0 if computed_at is None else int(time.monotonic() - computed_at))
+    return response
+
+def invalidate_dashboard_cache():
+    with _dashboard_lock:
+        _dashboard_cache['stats'] = None
+
+# ============ QUADRO DE PRODUÇÃO ============
+
+BOARD_STAGES = ['Aguardando', *PRODUCTION_STAGES, 'Qualidade', 'Concluído']
+BOARD_LANE_SIZE = 20
+
+def board_lane_page(stage, fields=ORDER_FIELDS):
+    """Próxima página de uma raia (?stage=&cursor=)."""
+    query = order_list_query(BOARD_ORDER, fields).where(Order.stage == stage)
+    query, limit = page_query(query, BOARD_ORDER, default_limit=BOARD_LANE_SIZE)
+    rows = db.session.execute(query).all()
+    return {'stage': stage, **page_payload(rows, BOARD_ORDER, row_serializer(fields), limit)}
+
+def order_board(fields=ORDER_FIELDS):
+    """Contagem por etapa e a primeira página de cada raia, em dois SELECTs.
+
+    Cada raia é uma subconsulta com LIMIT sobre ix_orders_board, unidas por
+    UNION ALL: o custo depende do tamanho da página, não do total de pedidos.
+    Etapas fora de BOARD_STAGES que tenham pedidos viram raias no fim.
+    """
+    limit = parse_limit(BOARD_LANE_SIZE)
+    counts = dict(db.session.execute(select(Order.stage, func.count(Order.id)).group_by(Order.stage)).all())
+    stages = BOARD_STAGES + sorted(stage for stage in counts if stage and stage not in BOARD_STAGES)
+
+    lanes = [
+        (stage, order_list_query(BOARD_ORDER, fields).where(Order.stage == stage)
+         .order_by(*BOARD_ORDER).limit(limit + 1).subquery())
+        for stage in stages if counts.get(stage)
+    ]
+    rows_by_stage = {}
+    if lanes:
+        # índice da raia na frente de cada linha: o campo stage pode ter ficado fora de ?fields=
+        query = union_all(*[select(literal_column(str(i)), lane) for i, (_, lane) in enumerate(lanes)])
+        for row in db.session.execute(query):
+            rows_by_stage.setdefault(lanes[row[0]][0], []).append(row[1:])
+
+    serialize = row_serializer(fields)
+    return {'lanes': [
+        {'stage': stage, 'count': counts.get(stage, 0),
+         **page_payload(rows_by_stage.get(stage, []), BOARD_ORDER, serialize, limit)}
+        for stage in stages
+    ]}
+
+# ============ ATUALIZAÇÃO DE PEDIDOS ============
+
+ORDER_TRANSITIONS_MAX = 1000
+
+def order_progress(value):
+    progress = bulk_int(value)
+    if not 0 <= progress <= 100:
+        raise ValueError('use um valor entre 0 e 100')
+    return progress
+
+def order_stage(value):
+    stage = bulk_text(value)
+    if stage is not None and stage not in BOARD_STAGES:
+        raise ValueError(f"etapa desconhecida; use uma de: {', '.join(BOARD_STAGES)}")
+    return stage
+
+ORDER_PRIORITIES = [name for name, _ in ORDER_PRIORITY_RANKS]
+
+def order_priority(value):
+    priority = bulk_text(value)
+    if priority is not None and priority not in ORDER_PRIORITIES:
+        raise ValueError(f"prioridade desconhecida; use uma de: {', '.join(ORDER_PRIORITIES)}")
+    return priority
+
+def order_delivery_date(value):
+    return bulk_date(value) if value else None
+
+# campo da API -> (coluna, conversor, aceita nulo)
+ORDER_UPDATE_FIELDS = {
+    'stage': ('stage', order_stage, False),
+    'progress': ('progress', order_progress, False),
+    'priority': ('priority', order_priority, False),
+    'deliveryDate': ('delivery_date', order_delivery_date, True),
+}
+
+def parse_order_update(item, order_id=None):
+    """Item da API -> ((id, versão ou None, {coluna: valor}), erros).
+
+    Só os campos presentes mudam; sem version a escrita não é condicional.
+    """
+    errors, values = {}, {}
+    if order_id is None:
+        try:
+            order_id = int(item['id'])
+        except (KeyError, TypeError, ValueError):
+            errors['id'] = 'obrigatório'
+    version = item.get('version')
+    if version is not None:
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            errors['version'] = 'valor inválido'
+    for field, (column, convert, nullable) in ORDER_UPDATE_FIELDS.items():
+        if field not in item:
+            continue
+        try:
+            value = convert(item[field]) if item[field] is not None else None
+        except (ValueError, TypeError) as e:
+            errors[field] = str(e) or 'valor inválido'
+            continue
+        if value is None and not nullable:
+            errors[field] = 'obrigatório'
+        else:
+            values[column] = value
+    if not values and not errors:
+        errors['_'] = 'nenhum campo para alterar'
+    return (order_id, version, values), errors
+
+def apply_order_updates(updates):
+    """Aplica as alterações com UPDATEs em conjunto; retorna {id: nova versão}.
+
+    Um UPDATE por combinação de valores (mover 50 pedidos de Corte para
+    Estampa é um comando só), filtrando por (id, version) IN (...) e
+    incrementando version: sem SELECT antes nem lock de leitura. Pedidos que
+    ficam de fora do RETURNING mudaram desde a leitura (ou não existem).
+    """
+    groups = {}
+    for order_id, version, values in updates:
+        groups.setdefault(tuple(sorted(values.items())), []).append((order_id, version))
+
+    applied = {}
+    for values, targets in groups.items():
+        versioned = [(order_id, version) for order_id, version in targets if version is not None]
+        unversioned = [order_id for order_id, version in targets if version is None]
+        conditions = []
+        if versioned:
+            conditions.append(tuple_(Order.id, Order.version).in_(versioned))
+        if unversioned:
+            conditions.append(Order.id.in_(unversioned))
+        stmt = (
+            update(Order).where(or_(*conditions))
+            .values(**dict(values), version=Order.version + 1)
+            .returning(Order.id, Order.version)
+            .execution_options(synchronize_session=False)
+        )
+        applied.update(db.session.execute(stmt).all())
+    return applied
+
+def order_update_conflicts(updates, applied):
+    """Versão atual dos pedidos que não foram alterados (None = não existe)."""
+    missing = [order_id for order_id, _, _ in updates if order_id not in applied]
+    if not missing:
+        return {}
+    current = dict(db.session.execute(select(Order.id, Order.version).where(Order.id.in_(missing))).all())
+    return {order_id: current.get(order_id) for order_id in missing}
+
+def commit_order_updates():
+    bump_table_version('orders')
+    db.session.commit()
+    invalidate_dashboard_cache()
+
+# ============ CONVERSÃO DE COTAÇÕES ============
+
+QUOTE_CONVERTED_STATUS = 'Convertida'
+
+# campo opcional do corpo -> (coluna, conversor, padrão)
+QUOTE_CONVERSION_FIELDS = {
+    'priority': ('priority', bulk_text, 'Normal'),
+    'deliveryDate': ('delivery_date', order_delivery_date, None),
+}
+
+def parse_quote_conversion(data):
+    """Corpo opcional de /convert -> ({coluna: valor}, erros)."""
+    errors, values = {}, {}
+    for field, (column, convert, default) in QUOTE_CONVERSION_FIELDS.items():
+        try:
+            value = convert(data[field]) if data.get(field) is not None else None
+        except (ValueError, TypeError) as e:
+            errors[field] = str(e) or 'valor inválido'
+            continue
+        values[column] = default if value is None else value
+    return values, errors
+
+def claim_quote(quote_id):
+    """Marca a cotação como convertida se ela ainda pode virar pedido; True se marcou.
+
+    O UPDATE condicional é o ponto de serialização: cliques simultâneos
+    esperam o lock da linha e, depois do commit do primeiro, não casam mais
+    com o WHERE. Cotações que já têm pedido (criado por POST /api/orders com
+    quoteId) também ficam de fora.
+    """
+    has_order = select(Order.id).where(Order.quote_id == quote_id).exists()
+    stmt = (
+        update(Quote)
+        .where(
+            Quote.id == quote_id,
+            Quote.client_id.isnot(None),
+            or_(Quote.status.is_(None), Quote.status != QUOTE_CONVERTED_STATUS),
+            ~has_order
+        )
+        .values(status=QUOTE_CONVERTED_STATUS)
+        .returning(Quote.id)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).first() is not None
+
+def insert_order_from_quote(quote_id, order_number, values):
+    """INSERT ... SELECT copiando cliente, itens e valor da cotação; retorna a linha criada."""
+    columns = {
+        'order_number': literal(order_number),
+        'quote_id': Quote.id,
+        'client_id': Quote.client_id,
+        'items_summary': Quote.items_summary,
+        'total_value': Quote.total_value,
+        'delivery_date': literal(values['delivery_date'], db.Date()),
+        'stage': literal('Aguardando'),
+        'progress': literal(0),
+        'priority': literal(values['priority']),
+        'version': literal(1),
+        'created_at': literal(datetime.utcnow(), db.DateTime()),
+    }
+    stmt = (
+        Order.__table__.insert()
+        .from_select(list(columns), select(*columns.values()).where(Quote.id == quote_id))
+        .returning(Order.id, Order.order_number, Order.items_summary, Order.created_at)
+    )
+    return db.session.execute(stmt).one()
+
+def quote_conversion_state(quote_id):
+    """Cliente da cotação e pedido já criado (se houver); None se a cotação não existe."""
+    return db.session.execute(
+        select(Quote.client_id, Order.id.label('order_id'), Order.order_number)
+        .outerjoin(Order, Order.quote_id == Quote.id)
+        .where(Quote.id == quote_id)
+        .order_by(Order.id)
+        .limit(1)
+    ).first()
+
+# ============ SÉRIES DIÁRIAS ============
+
+DAILY_STAT_COLUMNS = ('quotes', 'orders', 'converted_orders', 'revenue')
+TIMESERIES_DEFAULT_DAYS = 30
+TIMESERIES_MAX_DAYS = 1095
+
+def is_confirmed_income(row):
+    return row['type'] == 'income' and row['status'] == 'Confirmado'
+
+def add_to_daily_stats(increments):
+    """Soma {dia: {coluna: valor}} em daily_stats; chamar antes do commit.
+
+    Um upsert por dia, em ordem de data (mesma ordem de locks entre workers).
+    """
+    if not increments:
+        return
+    stmt = dialect_insert(DailyStat)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStat.day],
+        set_={column: getattr(DailyStat, column) + getattr(stmt.excluded, column) for column in DAILY_STAT_COLUMNS}
+    )
+    db.session.execute(stmt, [
+        {'day': day, **{column: values.get(column, 0) for column in DAILY_STAT_COLUMNS}}
+        for day, values in sorted(increments.items())
+    ])
+
+def add_revenue_to_daily_stats(rows):
+    """Receita confirmada de transações novas (dicts com CASHFLOW_COLUMNS)."""
+    revenue = {}
+    for row in rows:
+        if is_confirmed_income(row):
+            day = row['transaction_date']
+            revenue[day] = revenue.get(day, Decimal(0)) + Decimal(str(row['amount']))
+    add_to_daily_stats({day: {'revenue': amount} for day, amount in revenue.items()})
+
+def rebuild_daily_stats():
+    """Recalcula daily_stats a partir de cotações, pedidos e transações; retorna quantos dias."""
+    lock_for_rebuild(DailyStat)
+    quote_day = day_of(Quote.created_at)
+    order_day = day_of(Order.created_at)
+    sources = (
+        ('quotes', select(quote_day, func.count(Quote.id)).group_by(quote_day)),
+        ('orders', select(order_day, func.count(Order.id)).group_by(order_day)),
+        ('converted_orders', select(order_day, func.count(Order.id)).where(Order.quote_id.isnot(None)).group_by(order_day)),
+        ('revenue', select(Transaction.transaction_date, func.sum(Transaction.amount)).where(
+            Transaction.type == 'income', Transaction.status == 'Confirmado'
+        ).group_by(Transaction.transaction_date)),
+    )
+    increments = {}
+    for column, query in sources:
+        for day, value in db.session.execute(query):
+            if day is not None:
+                increments.setdefault(day, {})[column] = value
+
+    db.session.execute(DailyStat.__table__.delete())
+    add_to_daily_stats(increments)
+    db.session.commit()
+    return len(increments)
+
+def conversion_rate(converted, quotes):
+    return round(converted / quotes, 4) if quotes else None
+
+def timeseries_range():
+    date_from, date_to = parse_date_arg('from'), parse_date_arg('to')
+    if not date_from:
+        raw = request.args.get('days')
+        try:
+            days = int(raw) if raw else TIMESERIES_DEFAULT_DAYS
+        except ValueError:
+            raise ValueError('Parâmetro days inválido')
+        if not 1 <= days <= TIMESERIES_MAX_DAYS:
+            raise ValueError(f'Parâmetro days deve estar entre 1 e {TIMESERIES_MAX_DAYS}')
+        date_from = (date_to or datetime.utcnow().date()) - timedelta(days=days - 1)
+    date_to = date_to or datetime.utcnow().date()
+    if date_to < date_from or (date_to - date_from).days >= TIMESERIES_MAX_DAYS:
+        raise ValueError(f'Período inválido (máximo de {TIMESERIES_MAX_DAYS} dias)')
+    return date_from, date_to
+
+def dashboard_timeseries():
+    """Uma linha de daily_stats por dia do período; dias sem movimento saem zerados."""
+    date_from, date_to = timeseries_range()
+    rows = {
+        row.day: row for row in db.session.execute(
+            select(DailyStat.day, *[getattr(DailyStat, c) for c in DAILY_STAT_COLUMNS])
+            .where(DailyStat.day.between(date_from, date_to))
+        )
+    }
+
+    series, totals = [], dict.fromkeys(DAILY_STAT_COLUMNS, 0)
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        row = rows.get(day)
+        values = {c: getattr(row, c) if row else 0 for c in DAILY_STAT_COLUMNS}
+        for column in DAILY_STAT_COLUMNS:
+            totals[column] += values[column]
+        series.append({
+            'date': day.isoformat(),
+            'revenue': values['revenue'],
+            'quotes': values['quotes'],
+            'orders': values['orders'],
+            'convertedOrders': values['converted_orders'],
+            'conversionRate': conversion_rate(values['converted_orders'], values['quotes'])
+        })
+
+    return {
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'series': series,
+        'totals': {
+            'revenue': totals['revenue'],
+            'quotes': totals['quotes'],
+            'orders': totals['orders'],
+            'convertedOrders': totals['converted_orders'],
+            'conversionRate': conversion_rate(totals['converted_orders'], totals['quotes'])
+        }
+    }
+
+# ============ FLUXO DE CAIXA ============
+
+CASHFLOW_COLUMNS = ('transaction_date', 'type', 'category', 'status', 'amount')
+CASHFLOW_GROUPS = {
+    'month': CashflowMonthly.month,
+    'type': CashflowMonthly.type,
+    'category': CashflowMonthly.category,
+    'status': CashflowMonthly.status,
+}
+CASHFLOW_DEFAULT_GROUPS = ('month', 'type')
+
+def add_to_cashflow(rows):
+    """Soma transações novas (dicts com CASHFLOW_COLUMNS) no rollup; chamar antes do commit.
+
+    Agrupa em Python e faz um upsert por chave; as chaves vão em ordem para
+    que importações simultâneas travem as linhas na mesma sequência.
+    """
+    totals = {}
+    for row in rows:
+        day = row['transaction_date']
+        key = (day.replace(day=1), row['type'], row['category'] or '', row['status'] or '')
+        amount, count = totals.get(key, (Decimal(0), 0))
+        totals[key] = (amount + Decimal(str(row['amount'])), count + 1)
+    if not totals:
+        return
+
+    stmt = dialect_insert(CashflowMonthly)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CashflowMonthly.month, CashflowMonthly.type, CashflowMonthly.category, CashflowMonthly.status],
+        set_={
+            'amount': CashflowMonthly.amount + stmt.excluded.amount,
+            'count': CashflowMonthly.count + stmt.excluded.count
+        }
+    )
+    db.session.execute(stmt, [
+        {'month': month, 'type': type_, 'category': category, 'status': status, 'amount': amount, 'count': count}
+        for (month, type_, category, status), (amount, count) in sorted(totals.items())
+    ])
+
+def rebuild_cashflow():
+    """Recalcula cashflow_monthly inteiro com um INSERT ... SELECT; retorna quantas linhas."""
+    month = month_start(Transaction.transaction_date)
+    category = func.coalesce(Transaction.category, '')
+    status = func.coalesce(Transaction.status, '')
+    query = select(
+        month, Transaction.type, category, status, func.sum(Transaction.amount), func.count(Transaction.id)
+    ).where(Transaction.transaction_date.isnot(None)).group_by(month, Transaction.type, category, status)
+
+    lock_for_rebuild(CashflowMonthly)
+    db.session.execute(CashflowMonthly.__table__.delete())
+    db.session.execute(CashflowMonthly.__table__.insert().from_select(
+        ['month', 'type', 'category', 'status', 'amount', 'count'], query
+    ))
+    db.session.commit()
+    return db.session.execute(select(func.count()).select_from(CashflowMonthly)).scalar_one()
+
+def parse_month_arg(name):
+    """AAAA-MM ou AAAA-MM-DD; o rollup é mensal, então vale o mês inteiro."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    for fmt in ('%Y-%m', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(raw, fmt).date().replace(day=1)
+        except ValueError:
+            pass
+    raise ValueError(f'Parâmetro {name} inválido (use AAAA-MM)')
+
+def cashflow_report():
+    groups = [g for g in request.args.get('groupBy', '').split(',') if g] or list(CASHFLOW_DEFAULT_GROUPS)
+    if any(group not in CASHFLOW_GROUPS for group in groups):
+        raise ValueError('Parâmetro groupBy inválido (use month, type, category, status)')
+    columns = [CASHFLOW_GROUPS[group] for group in groups]
+
+    def filtered(query):
+        query = apply_filters(query, {
+            'type': CashflowMonthly.type,
+            'status': CashflowMonthly.status,
+            'category': CashflowMonthly.category
+        })
+        month_from, month_to = parse_month_arg('from'), parse_month_arg('to')
+        if month_from:
+            query = query.where(CashflowMonthly.month >= month_from)
+        if month_to:
+            query = query.where(CashflowMonthly.month <= month_to)
+        return query
+
+    amount = func.sum(CashflowMonthly.amount)
+    count = func.sum(CashflowMonthly.count)
+    rows = db.session.execute(
+        filtered(select(*columns, amount, count)).group_by(*columns).order_by(*columns)
+    ).all()
+    totals = dict(db.session.execute(
+        filtered(select(CashflowMonthly.type, amount)).group_by(CashflowMonthly.type)
+    ).all())
+
+    def output(group, value):
+        if group == 'month':
+            return value.strftime('%Y-%m')
+        return value or None
+
+    income, expense = totals.get('income') or 0, totals.get('expense') or 0
+    return {
+        'groupBy': groups,
+        'rows': [
+            {**{group: output(group, value) for group, value in zip(groups, row)},
+             'amount': row[-2] or 0, 'count': row[-1] or 0}
+            for row in rows
+        ],
+        'totals': {'income': income, 'expense': expense, 'net': income - expense}
+    }
+
+# ============ INSTRUMENTAÇÃO DAS REQUISIÇÕES ============
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    elapsed = time.perf_counter() - conn.info.get('query_started', time.perf_counter())
+    stats = g.get('sql_stats')
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_stats = [0, 0.0]
+
+@app.after_request
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    # Em respostas em streaming roda só depois do último chunk
+    started = g.get('request_started')
+    if started is None:
+        return
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = 500 if exc is not None else g.get('response_status', 500)
+    statements, db_seconds = g.sql_stats
+    request_latency.observe(time.perf_counter() - started, route, request.method, str(status))
+    request_sql_statements.observe(statements, route, request.method)
+    request_db_time.observe(db_seconds, route, request.method)
+    schedule_metrics_snapshot()
+
+def render_metrics():
+    lines = []
+    series = aggregated_histograms()
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(series[histogram.name]))
+
+    # Pool e cache de referência são estado de cada processo: rótulo worker
+    worker = f'worker="{os.getpid()}"'
+
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        gauges = (
+            ('emunah_db_pool_size', 'Conexões fixas do pool', pool.size()),
+            ('emunah_db_pool_checked_out', 'Conexões em uso', checked_out),
+            ('emunah_db_pool_overflow', 'Conexões de overflow abertas', max(pool.overflow(), 0)),
+            ('emunah_db_pool_saturation', 'Conexões em uso / capacidade', checked_out / capacity if capacity else 0),
+        )
+        for name, help_text, value in gauges:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name}{{{worker}}} {value}"])
+
+    cache = reference_cache.stats()
+    for key in ('hits', 'misses', 'evictions'):
+        name = f'emunah_reference_cache_{key}_total'
+        lines.extend([f"# HELP {name} Cache de referência: {key}", f"# TYPE {name} counter",
+                      f"{name}{{{worker}}} {cache[key]}"])
+    return '\n'.join(lines) + '\n'
 
 # ============ ROTAS DA API ============
 
@@ -138,18 +2415,14 @@ def health():
     return jsonify({'status': 'ok', 'build': has_build})
 
 @app.route('/api/clients', methods=['GET'])
+@etag_for('clients')
 def get_clients():
     try:
-        clients = Client.query.all()
-        return jsonify([{
-            'id': c.id,
-            'name': c.name,
-            'contact': c.contact,
-            'email': c.email,
-            'phone': c.phone,
-            'address': c.address,
-            'createdAt': c.created_at.isoformat() if c.created_at else None
-        } for c in clients])
+        fields = requested_fields(Client)
+        query = apply_filters(list_query(Client, fields, CLIENT_ORDER), {}, Client.created_at)
+        return paginated_response(query, CLIENT_ORDER, row_serializer(fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching clients: {e}")
         return jsonify({'error': 'Failed to fetch clients'}), 500
@@ -166,28 +2439,43 @@ def create_client():
             address=data.get('address')
         )
         db.session.add(client)
+        index_search_record('client', client)
+        bump_table_version('clients')
         db.session.commit()
+        invalidate_dashboard_cache()
         return jsonify({'id': client.id, 'message': 'Cliente criado com sucesso'}), 201
     except Exception as e:
         print(f"Error creating client: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create client'}), 500
 
+@app.route('/api/clients/bulk', methods=['POST'])
+def bulk_create_clients():
+    try:
+        response = bulk_import('clients', Client)
+        invalidate_dashboard_cache()
+        return response
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error importing clients: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import clients'}), 500
+
 @app.route('/api/suppliers', methods=['GET'])
+@etag_for('suppliers')
 def get_suppliers():
     try:
-        suppliers = Supplier.query.all()
-        return jsonify([{
-            'id': s.id,
-            'name': s.name,
-            'contact': s.contact,
-            'email': s.email,
-            'phone': s.phone,
-            'category': s.category,
-            'status': s.status,
-            'rating': s.rating,
-            'productionTimeDays': s.production_time_days
-        } for s in suppliers])
+        fields = requested_fields(Supplier)
+        return cached_list_response('suppliers', lambda: apply_filters(
+            list_query(Supplier, fields, SUPPLIER_ORDER), {
+                'status': Supplier.status,
+                'category': Supplier.category
+            }, Supplier.created_at
+        ), SUPPLIER_ORDER, row_serializer(fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching suppliers: {e}")
         return jsonify({'error': 'Failed to fetch suppliers'}), 500
@@ -207,7 +2495,9 @@ def create_supplier():
             production_time_days=data.get('productionTimeDays', 7)
         )
         db.session.add(supplier)
+        bump_table_version('suppliers')
         db.session.commit()
+        reference_cache.invalidate('suppliers')
         return jsonify({'id': supplier.id, 'message': 'Fornecedor criado com sucesso'}), 201
     except Exception as e:
         print(f"Error creating supplier: {e}")
@@ -215,20 +2505,15 @@ def create_supplier():
         return jsonify({'error': 'Failed to create supplier'}), 500
 
 @app.route('/api/products', methods=['GET'])
+@etag_for('products')
 def get_products():
     try:
-        products = Product.query.all()
-        return jsonify([{
-            'id': p.id,
-            'name': p.name,
-            'sku': p.sku,
-            'category': p.category,
-            'price': float(p.price) if p.price else 0,
-            'cost': float(p.cost) if p.cost else 0,
-            'stock': p.stock,
-            'colors': p.colors,
-            'sizes': p.sizes
-        } for p in products])
+        fields = requested_fields(Product)
+        return cached_list_response('products', lambda: apply_filters(
+            list_query(Product, fields, PRODUCT_ORDER), {'category': Product.category}, Product.created_at
+        ), PRODUCT_ORDER, row_serializer(fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching products: {e}")
         return jsonify({'error': 'Failed to fetch products'}), 500
@@ -248,26 +2533,40 @@ def create_product():
             sizes=data.get('sizes')
         )
         db.session.add(product)
+        index_search_record('product', product)
+        bump_table_version('products')
         db.session.commit()
+        reference_cache.invalidate('products')
         return jsonify({'id': product.id, 'message': 'Produto criado com sucesso'}), 201
     except Exception as e:
         print(f"Error creating product: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create product'}), 500
 
+@app.route('/api/products/bulk', methods=['POST'])
+def bulk_create_products():
+    try:
+        response = bulk_import('products', Product)
+        reference_cache.invalidate('products')
+        return response
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error importing products: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import products'}), 500
+
 @app.route('/api/prints', methods=['GET'])
+@etag_for('prints')
 def get_prints():
     try:
-        prints = Print.query.all()
-        return jsonify([{
-            'id': p.id,
-            'name': p.name,
-            'technique': p.technique,
-            'colors': p.colors,
-            'imageUrl': p.image_url,
-            'imageType': p.image_type,
-            'tags': p.tags
-        } for p in prints])
+        fields = requested_fields(Print)
+        return cached_list_response('prints', lambda: apply_filters(
+            list_query(Print, fields, PRINT_ORDER), {'technique': Print.technique}, Print.created_at
+        ), PRINT_ORDER, row_serializer(fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching prints: {e}")
         return jsonify({'error': 'Failed to fetch prints'}), 500
@@ -280,38 +2579,89 @@ def create_print():
             name=data.get('name'),
             technique=data.get('technique'),
             colors=data.get('colors'),
-            image_url=data.get('imageUrl'),
-            image_type=data.get('imageType', 'url'),
-            tags=data.get('tags')
+            tags=data.get('tags'),
+            **print_image_columns(data)
         )
         db.session.add(print_item)
+        index_search_record('print', print_item)
+        bump_table_version('prints')
         db.session.commit()
+        reference_cache.invalidate('prints')
         return jsonify({'id': print_item.id, 'message': 'Estampa criada com sucesso'}), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error creating print: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create print'}), 500
 
+@app.route('/api/prints/upload', methods=['POST'])
+def upload_print_image():
+    """Arquivo em multipart (campo file) -> repositório; a URL devolvida vai em imageUrl da estampa."""
+    if IS_PRODUCTION and not IMAGE_STORAGE_CONFIGURED:
+        # o arquivo iria para um disco que some no próximo deploy
+        return jsonify({'error': 'Upload indisponível: configure IMAGE_STORAGE_PATH com um volume persistente'}), 503
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Envie a imagem no campo file'}), 400
+        # um byte a mais que o limite basta para recusar arquivos grandes
+        key, width, height = store_image(upload.read(IMAGE_MAX_BYTES + 1))
+        return jsonify({
+            'key': key,
+            'url': IMAGE_URL_PREFIX + key,
+            'thumbnailUrl': f'{IMAGE_URL_PREFIX}{key}/thumb',
+            'width': width,
+            'height': height
+        }), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error uploading print image: {e}")
+        return jsonify({'error': 'Failed to upload image'}), 500
+
+@app.route('/api/images/<key>', methods=['GET'])
+def get_image(key):
+    try:
+        if not restore_image(key):
+            return jsonify({'error': 'Imagem não encontrada'}), 404
+        digest, ext = key.split('.')
+        return send_image(image_path(key), digest, IMAGE_MIMETYPES[ext])
+    except Exception as e:
+        print(f"Error fetching image: {e}")
+        return jsonify({'error': 'Failed to fetch image'}), 500
+
+@app.route('/api/images/<key>/thumb', methods=['GET'])
+def get_image_thumbnail(key):
+    """Miniatura com ?w= (160, 320 ou 640); 304 pelo ETag sem abrir a imagem."""
+    try:
+        if not restore_image(key):
+            return jsonify({'error': 'Imagem não encontrada'}), 404
+        width = request.args.get('w', THUMBNAIL_DEFAULT_WIDTH, type=int)
+        if width not in THUMBNAIL_WIDTHS:
+            return jsonify({'error': f'Parâmetro w deve ser um de {list(THUMBNAIL_WIDTHS)}'}), 400
+        digest, ext = key.split('.')
+        etag = f'{digest}-{width}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE
+            return response
+        return send_image(thumbnail_file(key, width), etag, IMAGE_MIMETYPES[ext])
+    except Exception as e:
+        print(f"Error generating thumbnail: {e}")
+        return jsonify({'error': 'Failed to generate thumbnail'}), 500
+
 @app.route('/api/quotes', methods=['GET'])
+@etag_for('quotes', 'clients')
 def get_quotes():
     try:
-        quotes = Quote.query.all()
-        result = []
-        for q in quotes:
-            client_name = q.client.name if q.client else q.lead_name
-            contact = q.client.contact if q.client else q.lead_contact
-            result.append({
-                'id': q.id,
-                'quoteNumber': q.quote_number,
-                'clientId': q.client_id,
-                'clientName': client_name,
-                'contact': contact,
-                'itemsSummary': q.items_summary,
-                'totalValue': float(q.total_value) if q.total_value else 0,
-                'status': q.status,
-                'date': q.created_at.strftime('%d/%m/%Y') if q.created_at else ''
-            })
-        return jsonify(result)
+        fields = requested_fields(Quote)
+        query = apply_filters(quote_list_query(fields), QUOTE_FILTERS, Quote.created_at)
+        return paginated_response(query, QUOTE_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching quotes: {e}")
         return jsonify({'error': 'Failed to fetch quotes'}), 500
@@ -320,9 +2670,7 @@ def get_quotes():
 def create_quote():
     try:
         data = request.json
-        last_quote = Quote.query.order_by(Quote.id.desc()).first()
-        next_id = (last_quote.id if last_quote else 0) + 1
-        quote_num = f"COT-2024-{str(next_id).zfill(3)}"
+        quote_num = allocate_document_number(QUOTE_PREFIX)
         
         quote = Quote(
             quote_number=quote_num,
@@ -334,42 +2682,165 @@ def create_quote():
             status=data.get('status', 'Rascunho')
         )
         db.session.add(quote)
+        index_search_record('quote', quote)
+        add_to_daily_stats({quote.created_at.date(): {'quotes': 1}})
+        bump_table_version('quotes')
         db.session.commit()
+        invalidate_dashboard_cache()
         return jsonify({'id': quote.id, 'quoteNumber': quote_num, 'message': 'Cotação criada com sucesso'}), 201
     except Exception as e:
         print(f"Error creating quote: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create quote'}), 500
 
+@app.route('/api/quotes/<int:quote_id>/convert', methods=['POST'])
+def convert_quote(quote_id):
+    """Cria o pedido da cotação em uma transação; repetir a chamada devolve o mesmo pedido."""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Envie um objeto JSON'}), 400
+        values, errors = parse_quote_conversion(data)
+        if errors:
+            return jsonify({'error': 'Validation failed', 'errors': errors}), 400
+
+        if not claim_quote(quote_id):
+            db.session.rollback()
+            state = quote_conversion_state(quote_id)
+            if state is None:
+                return jsonify({'error': 'Cotação não encontrada'}), 404
+            if state.order_id is not None:
+                return jsonify({
+                    'id': state.order_id,
+                    'orderNumber': state.order_number,
+                    'quoteId': quote_id,
+                    'alreadyConverted': True,
+                    'message': 'Cotação já convertida em pedido'
+                })
+            if state.client_id is None:
+                return jsonify({'error': 'Cadastre o cliente da cotação antes de convertê-la'}), 422
+            return jsonify({'error': 'Cotação marcada como convertida, mas sem pedido'}), 409
+
+        order_num = allocate_document_number(ORDER_PREFIX)
+        order = insert_order_from_quote(quote_id, order_num, values)
+        index_search_records('order', [order._asdict()])
+        add_to_daily_stats({order.created_at.date(): {'orders': 1, 'converted_orders': 1}})
+        bump_table_version('quotes', 'orders')
+        db.session.commit()
+        invalidate_dashboard_cache()
+        return jsonify({
+            'id': order.id,
+            'orderNumber': order_num,
+            'quoteId': quote_id,
+            'alreadyConverted': False,
+            'message': 'Pedido criado a partir da cotação'
+        }), 201
+    except Exception as e:
+        print(f"Error converting quote: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to convert quote'}), 500
+
 @app.route('/api/orders', methods=['GET'])
+@etag_for('orders', 'clients')
 def get_orders():
     try:
-        orders = Order.query.all()
-        result = []
-        for o in orders:
-            result.append({
-                'id': o.id,
-                'orderNumber': o.order_number,
-                'clientName': o.client.name if o.client else '',
-                'itemsSummary': o.items_summary,
-                'totalValue': float(o.total_value) if o.total_value else 0,
-                'deliveryDate': o.delivery_date.strftime('%d/%m/%Y') if o.delivery_date else None,
-                'stage': o.stage,
-                'progress': o.progress,
-                'priority': o.priority
-            })
-        return jsonify(result)
+        fields = requested_fields(Order)
+        query = apply_filters(order_list_query(fields=fields), ORDER_FILTERS, Order.created_at)
+        return paginated_response(query, ORDER_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching orders: {e}")
         return jsonify({'error': 'Failed to fetch orders'}), 500
 
+@app.route('/api/orders/board', methods=['GET'])
+@etag_for('orders', 'clients')
+def get_order_board():
+    try:
+        stage = request.args.get('stage')
+        fields = requested_fields(Order)
+        return jsonify(board_lane_page(stage, fields) if stage else order_board(fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error fetching order board: {e}")
+        return jsonify({'error': 'Failed to fetch order board'}), 500
+
+@app.route('/api/orders/<int:order_id>', methods=['PATCH'])
+def update_order(order_id):
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Envie um objeto JSON'}), 400
+        parsed, errors = parse_order_update(data, order_id)
+        if errors:
+            return jsonify({'error': 'Validation failed', 'errors': errors}), 400
+
+        applied = apply_order_updates([parsed])
+        if order_id not in applied:
+            db.session.rollback()
+            current = order_update_conflicts([parsed], applied)[order_id]
+            if current is None:
+                return jsonify({'error': 'Pedido não encontrado'}), 404
+            return jsonify({'error': 'Pedido alterado por outra pessoa', 'currentVersion': current}), 409
+        commit_order_updates()
+        return jsonify({'id': order_id, 'version': applied[order_id], 'message': 'Pedido atualizado com sucesso'})
+    except Exception as e:
+        print(f"Error updating order: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update order'}), 500
+
+@app.route('/api/orders/stage-transitions', methods=['POST'])
+def transition_orders():
+    """Lote de alterações {transitions: [{id, version, stage, progress, ...}]}, tudo ou nada."""
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('transitions') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Envie {"transitions": [...]}'}), 400
+        if len(items) > ORDER_TRANSITIONS_MAX:
+            return jsonify({'error': f'Máximo de {ORDER_TRANSITIONS_MAX} alterações por lote'}), 400
+
+        updates, errors, seen = [], [], set()
+        for index, item in enumerate(items, start=1):
+            if not isinstance(item, dict):
+                errors.append({'row': index, 'errors': {'_': 'linha deve ser um objeto'}})
+                continue
+            parsed, item_errors = parse_order_update(item)
+            if parsed[0] is not None and parsed[0] in seen:
+                item_errors['id'] = 'pedido repetido no lote'
+            seen.add(parsed[0])
+            if item_errors:
+                errors.append({'row': index, 'errors': item_errors})
+            else:
+                updates.append(parsed)
+        if errors:
+            return jsonify({'error': 'Validation failed', 'errors': errors}), 400
+
+        applied = apply_order_updates(updates)
+        if len(applied) < len(updates):
+            db.session.rollback()
+            conflicts = order_update_conflicts(updates, applied)
+            return jsonify({'error': 'Nenhuma alteração aplicada: há pedidos desatualizados', 'conflicts': [
+                {'id': order_id, 'currentVersion': version, 'reason': 'não encontrado' if version is None else 'versão'}
+                for order_id, version in conflicts.items()
+            ]}), 409
+        commit_order_updates()
+        return jsonify({
+            'updated': len(applied),
+            'versions': {str(order_id): version for order_id, version in applied.items()},
+            'message': f'{len(applied)} pedidos atualizados com sucesso'
+        })
+    except Exception as e:
+        print(f"Error applying order transitions: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to apply order transitions'}), 500
+
 @app.route('/api/orders', methods=['POST'])
 def create_order():
     try:
         data = request.json
-        last_order = Order.query.order_by(Order.id.desc()).first()
-        next_id = (last_order.id if last_order else 0) + 1
-        order_num = f"PED-{1024 + next_id}"
+        order_num = allocate_document_number(ORDER_PREFIX)
         
         delivery_date = None
         if data.get('deliveryDate'):
@@ -390,7 +2861,11 @@ def create_order():
             priority=data.get('priority', 'Normal')
         )
         db.session.add(order)
+        index_search_record('order', order)
+        add_to_daily_stats({order.created_at.date(): {'orders': 1, 'converted_orders': 1 if order.quote_id else 0}})
+        bump_table_version('orders')
         db.session.commit()
+        invalidate_dashboard_cache()
         return jsonify({'id': order.id, 'orderNumber': order_num, 'message': 'Pedido criado com sucesso'}), 201
     except Exception as e:
         print(f"Error creating order: {e}")
@@ -398,19 +2873,16 @@ def create_order():
         return jsonify({'error': 'Failed to create order'}), 500
 
 @app.route('/api/transactions', methods=['GET'])
+@etag_for('transactions')
 def get_transactions():
     try:
-        transactions = Transaction.query.order_by(Transaction.transaction_date.desc()).all()
-        return jsonify([{
-            'id': t.id,
-            'transactionNumber': t.transaction_number,
-            'description': t.description,
-            'category': t.category,
-            'type': t.type,
-            'amount': float(t.amount) if t.amount else 0,
-            'status': t.status,
-            'date': t.transaction_date.strftime('%d/%m/%Y') if t.transaction_date else ''
-        } for t in transactions])
+        fields = requested_fields(Transaction)
+        query = apply_filters(
+            list_query(Transaction, fields, TRANSACTION_ORDER), TRANSACTION_FILTERS, Transaction.transaction_date
+        )
+        return paginated_response(query, TRANSACTION_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching transactions: {e}")
         return jsonify({'error': 'Failed to fetch transactions'}), 500
@@ -419,9 +2891,7 @@ def get_transactions():
 def create_transaction():
     try:
         data = request.json
-        last_trx = Transaction.query.order_by(Transaction.id.desc()).first()
-        next_id = (last_trx.id if last_trx else 0) + 1
-        trx_num = f"TRX-{9800 + next_id}"
+        trx_num = allocate_document_number(TRANSACTION_PREFIX)
         
         transaction_date = None
         if data.get('transactionDate'):
@@ -443,41 +2913,174 @@ def create_transaction():
             transaction_date=transaction_date
         )
         db.session.add(transaction)
+        values = {column: getattr(transaction, column) for column in CASHFLOW_COLUMNS}
+        add_to_cashflow([values])
+        add_revenue_to_daily_stats([values])
+        bump_table_version('transactions')
         db.session.commit()
+        invalidate_dashboard_cache()
         return jsonify({'id': transaction.id, 'transactionNumber': trx_num, 'message': 'Transação criada com sucesso'}), 201
     except Exception as e:
         print(f"Error creating transaction: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create transaction'}), 500
 
+@app.route('/api/transactions/bulk', methods=['POST'])
+def bulk_create_transactions():
+    try:
+        response = bulk_import('transactions', Transaction)
+        invalidate_dashboard_cache()
+        return response
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error importing transactions: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import transactions'}), 500
+
+@app.route('/api/export/<any(transactions, orders, quotes):resource>.<any(csv, xlsx):fmt>', methods=['GET'])
+def export(resource, fmt):
+    """Lista completa (com os filtros da listagem) em streaming; memória constante no worker."""
+    try:
+        fields, query = export_query(resource)
+        chunks, mimetype = EXPORT_FORMATS[fmt]
+        filename = f'{resource}-{date.today().isoformat()}.{fmt}'
+        return Response(
+            stream_with_context(chunks(resource, query, fields)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error exporting {resource}: {e}")
+        return jsonify({'error': f'Failed to export {resource}'}), 500
+
 @app.route('/api/dashboard/stats', methods=['GET'])
+@etag_for(*DASHBOARD_TABLES)
 def get_dashboard_stats():
     try:
-        revenue_result = db.session.execute(text(
-            "SELECT COALESCE(SUM(CASE WHEN type = 'income' AND status = 'Confirmado' THEN amount ELSE 0 END), 0) as total FROM transactions"
-        )).fetchone()
-        total_revenue = float(revenue_result[0]) if revenue_result else 0
-        
-        pending_quotes = Quote.query.filter_by(status='Pendente').count()
-        
-        orders_in_production = Order.query.filter(
-            Order.stage.in_(['Corte', 'Estampa', 'Costura', 'Acabamento'])
-        ).count()
-        
-        total_clients = Client.query.count()
-        
-        return jsonify({
-            'totalRevenue': total_revenue,
-            'pendingQuotes': pending_quotes,
-            'ordersInProduction': orders_in_production,
-            'totalClients': total_clients
-        })
+        return dashboard_response(*get_cached_dashboard_stats())
     except Exception as e:
         print(f"Error fetching dashboard stats: {e}")
         return jsonify({'error': 'Failed to fetch dashboard stats'}), 500
 
+@app.route('/api/reports/cashflow', methods=['GET'])
+@etag_for('transactions')
+def get_cashflow_report():
+    try:
+        return jsonify(cashflow_report())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error fetching cashflow report: {e}")
+        return jsonify({'error': 'Failed to fetch cashflow report'}), 500
+
+@app.route('/api/search', methods=['GET'])
+@etag_for('clients', 'products', 'prints', 'orders', 'quotes')
+def search():
+    try:
+        tokens = re.findall(r'\w+', search_normalize(request.args.get('q', '')))
+        if not tokens:
+            raise ValueError('Parâmetro q obrigatório')
+        kinds = [k for k in request.args.get('types', '').split(',') if k]
+        if any(kind not in SEARCH_SOURCES for kind in kinds):
+            raise ValueError('Parâmetro types inválido')
+        limit = min(parse_limit(SEARCH_DEFAULT_LIMIT), SEARCH_MAX_LIMIT)
+
+        rows = db.session.execute(search_query(tokens, kinds, limit)).all()
+        return jsonify({'items': [
+            {'type': kind, 'id': ref_id, 'title': title, 'subtitle': subtitle}
+            for kind, ref_id, title, subtitle in rows
+        ]})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching: {e}")
+        return jsonify({'error': 'Failed to search'}), 500
+
+@app.route('/api/dashboard/timeseries', methods=['GET'])
+def get_dashboard_timeseries():
+    # Sem ETag: a janela de ?days= anda com a data mesmo sem escritas
+    try:
+        return jsonify(dashboard_timeseries())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error fetching dashboard timeseries: {e}")
+        return jsonify({'error': 'Failed to fetch dashboard timeseries'}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({'reference': reference_cache.stats()})
+
 # ============ SERVIR ARQUIVOS ESTÁTICOS ============
 
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+PUBLIC_FILE_CACHE = 'public, max-age=86400'
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def build_asset_manifest(root):
+    """Mapeia cada arquivo do build (caminho relativo -> metadados) uma vez só.
+
+    Os arquivos em assets/ têm hash do conteúdo no nome (Vite) e podem ser
+    cacheados para sempre; variantes .br/.gz geradas no build são anotadas
+    para negociação por Accept-Encoding.
+    """
+    manifest = {}
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for filename in filenames:
+            if filename.endswith(('.br', '.gz')) and filename[:-3] in names:
+                continue
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            variants = {}
+            for encoding, suffix in PRECOMPRESSED:
+                if filename + suffix in names:
+                    variants[encoding] = file_variant(full_path + suffix)
+            if rel_path == 'index.html':
+                cache_control = REVALIDATE_CACHE
+            elif rel_path.startswith('assets/'):
+                cache_control = IMMUTABLE_CACHE
+            else:
+                cache_control = PUBLIC_FILE_CACHE
+            manifest[rel_path] = {
+                'identity': file_variant(full_path),
+                'variants': variants,
+                'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'cache_control': cache_control
+            }
+    return manifest
+
+def file_variant(path):
+    stat = os.stat(path)
+    return {'path': path, 'etag': f"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"}
+
+def send_asset(asset):
+    variant, encoding = asset['identity'], None
+    for candidate, _ in PRECOMPRESSED:
+        if candidate in asset['variants'] and request.accept_encodings[candidate]:
+            variant, encoding = asset['variants'][candidate], candidate
+            break
+
+    etag = f"{variant['etag']}-{encoding}" if encoding else variant['etag']
+    response = send_file(variant['path'], mimetype=asset['mimetype'], etag=etag, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset['variants']:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = asset['cache_control']
+    return response
+
+asset_manifest = build_asset_manifest(STATIC_FOLDER) if has_build else {}
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -487,16 +3090,19 @@ def serve(path):
             'message': 'Execute npm run build para gerar os arquivos do frontend',
             'static_folder': STATIC_FOLDER
         }), 503
-    
-    if path and os.path.exists(os.path.join(STATIC_FOLDER, path)):
-        response = send_from_directory(STATIC_FOLDER, path)
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        return response
-    
-    response = send_from_directory(STATIC_FOLDER, 'index.html')
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    return response
+
+    asset = asset_manifest.get(path) if path else None
+    if asset:
+        return send_asset(asset)
+
+    # Chunk com hash inexistente (build antigo em cache): 404 em vez do index.html
+    if path.startswith('assets/'):
+        return jsonify({'error': 'Not found'}), 404
+
+    return send_asset(asset_manifest['index.html'])
 
 if __name__ == '__main__':
+    with app.app_context():
+        init_db()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
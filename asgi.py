@@ -0,0 +1,314 @@
+"""Entrada ASGI: leituras pesadas com SQLAlchemy asyncio, o resto no app Flask.
+
+    WEB_CONCURRENCY=2 uvicorn asgi:app --host 0.0.0.0 --port $PORT --proxy-headers
+
+GET /api/orders, /api/quotes, /api/transactions e /api/dashboard/stats rodam
+no event loop com driver assíncrono (asyncpg no PostgreSQL, aiosqlite no
+SQLite), então uma requisição esperando o banco não prende uma thread. As
+consultas, filtros, cursor, ETag e JSON são os mesmos do caminho síncrono
+(app.py); só a execução muda. As demais rotas (escritas, cadastros, arquivos
+estáticos) vão para o app Flask via WSGIMiddleware, em threads.
+
+Cada worker abre dois engines (o assíncrono e o síncrono do app Flask); os
+dois dividem a fatia do worker em DB_CONNECTION_BUDGET (db_budget.py). O
+número de workers vem de WEB_CONCURRENCY, que o uvicorn também usa como
+padrão de --workers.
+"""
+import asyncio
+import io
+import os
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import g, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from db_budget import connection_budget, engine_pool, engine_share, env_int
+
+# Antes de importar o app: o engine síncrono lê DB_POOL_SIZE / DB_MAX_OVERFLOW
+# (sob o gunicorn quem define é o gunicorn.conf.py, que não roda no uvicorn)
+WORKERS = env_int('WEB_CONCURRENCY', 1)
+WSGI_THREADS = env_int('ASGI_WSGI_THREADS', 10)
+default_sync_pool = engine_pool(WORKERS, WSGI_THREADS, engines=2)
+os.environ.setdefault('DB_POOL_SIZE', str(default_sync_pool[0]))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(default_sync_pool[1]))
+# o loop atende quantas requisições vierem: o pool assíncrono fica com a fatia inteira do engine
+ASYNC_POOL = (env_int('ASYNC_DB_POOL_SIZE', engine_share(WORKERS, engines=2)), env_int('ASYNC_DB_MAX_OVERFLOW', 0))
+
+from app import (  # noqa: E402
+    DASHBOARD_TABLES, ORDER_FILTERS, ORDER_ORDER, QUOTE_FILTERS, QUOTE_ORDER, STREAM_BATCH_SIZE,
+    TRANSACTION_FILTERS, TRANSACTION_ORDER,
+    Order, Quote, TableVersion, Transaction, app as flask_app,
+    apply_filters, archive_worker_metrics, cached_dashboard_stats, dashboard_payload, dashboard_queries,
+    dashboard_response, database_url, env_number, flag_arg, json_array_chunk, list_query, order_list_query,
+    page_payload, page_query, quote_list_query, requested_fields, row_serializer, store_dashboard_stats, table_etag
+)
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+def async_database_url(url):
+    url = make_url(url)
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    if 'sslmode' in url.query:
+        # asyncpg não conhece sslmode; o equivalente é ssl
+        url = url.update_query_dict({'ssl': url.query['sslmode']}).difference_update_query(['sslmode'])
+    return url
+
+def async_engine_options(url):
+    """Pool a partir de ASYNC_POOL (metade da fatia do worker); timeouts como no caminho síncrono."""
+    options = {
+        'pool_recycle': 300,
+        'pool_pre_ping': True,
+    }
+    if url.get_backend_name() == 'postgresql':
+        options.update({
+            'pool_size': ASYNC_POOL[0],
+            'max_overflow': ASYNC_POOL[1],
+            'pool_timeout': env_number('DB_POOL_TIMEOUT', 10, float),
+            'connect_args': {'server_settings': {
+                'statement_timeout': str(env_number('DB_STATEMENT_TIMEOUT_MS', 30000))
+            }},
+        })
+    return options
+
+async_url = async_database_url(database_url)
+async_engine = create_async_engine(async_url, **async_engine_options(async_url))
+
+# ============ RESPOSTAS ============
+
+class StreamingBody:
+    """Corpo em streaming para o ASGI; chunks é um gerador assíncrono de str."""
+
+    def __init__(self, chunks, mimetype='application/json'):
+        self.chunks = chunks
+        self.status_code = 200
+        self.headers = {'Content-Type': mimetype}
+
+    def set_etag(self, etag):
+        self.headers['ETag'] = f'"{etag}"'
+
+def error_response(body, status):
+    response = jsonify(body)
+    response.status_code = status
+    return response
+
+async def send_response(send, response):
+    headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.items()]
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    if isinstance(response, StreamingBody):
+        async for chunk in response.chunks:
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    else:
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+# ============ CONSULTAS ASSÍNCRONAS ============
+
+async def current_table_versions(names):
+    # Como no caminho síncrono: lidas uma vez por requisição (ETag e cache do dashboard)
+    known = g.setdefault('table_versions', {})
+    missing = [name for name in names if name not in known]
+    if missing:
+        async with async_engine.connect() as conn:
+            rows = await conn.execute(
+                select(TableVersion.name, TableVersion.value).where(TableVersion.name.in_(missing))
+            )
+            found = dict(rows.all())
+        for name in missing:
+            known[name] = found.get(name, 0)
+    return [known[name] for name in names]
+
+def async_etag_for(*names):
+    """Como etag_for, com as versões lidas pelo engine assíncrono."""
+    def decorator(view):
+        async def wrapper():
+            etag = table_etag(names, await current_table_versions(names))
+            if request.if_none_match.contains(etag):
+                response = flask_app.response_class(status=304)
+            else:
+                response = await view()
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def streamed_json_array(query, serialize):
+    async def generate():
+        yield '['
+        first = True
+        async with async_engine.connect() as conn:
+            result = await conn.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield ('' if first else ',') + json_array_chunk(rows, serialize)
+                first = False
+        yield ']'
+
+    return StreamingBody(generate())
+
+async def paginated_response(query, order_columns, serialize, descending=False):
+    if flag_arg('stream'):
+        order_by = [c.desc() for c in order_columns] if descending else list(order_columns)
+        return streamed_json_array(query.order_by(*order_by), serialize)
+    query, limit = page_query(query, order_columns, descending)
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(query)).all()
+    return jsonify(page_payload(rows, order_columns, serialize, limit))
+
+async def scalar(query):
+    # Uma conexão por indicador: as consultas rodam em paralelo no banco
+    async with async_engine.connect() as conn:
+        return await conn.scalar(query)
+
+_dashboard_refresh = None
+
+async def get_cached_dashboard_stats():
+    """Como a versão síncrona, sem bloquear o loop; requisições simultâneas aguardam o mesmo cálculo."""
+    global _dashboard_refresh
+    versions = tuple(await current_table_versions(DASHBOARD_TABLES))
+    stats, computed_at = cached_dashboard_stats(versions)
+    if stats is not None:
+        return stats, computed_at
+
+    # só reaproveita um cálculo iniciado com as mesmas versões (nunca um anterior à escrita)
+    if _dashboard_refresh is None or _dashboard_refresh[0] != versions:
+        _dashboard_refresh = (versions, asyncio.ensure_future(
+            asyncio.gather(*(scalar(query) for query in dashboard_queries()))
+        ))
+    refresh = _dashboard_refresh
+    try:
+        values = await asyncio.shield(refresh[1])
+    finally:
+        if _dashboard_refresh is refresh and refresh[1].done():
+            _dashboard_refresh = None
+
+    stats = dashboard_payload(values)
+    store_dashboard_stats(versions, stats)
+    return stats, None
+
+# ============ ROTAS ASSÍNCRONAS ============
+
+ASYNC_ROUTES = {}
+
+def async_route(path):
+    def decorator(view):
+        ASYNC_ROUTES[path] = view
+        return view
+    return decorator
+
+@async_route('/api/quotes')
+@async_etag_for('quotes', 'clients')
+async def get_quotes():
+    try:
+        fields = requested_fields(Quote)
+        query = apply_filters(quote_list_query(fields), QUOTE_FILTERS, Quote.created_at)
+        return await paginated_response(query, QUOTE_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return error_response({'error': str(e)}, 400)
+    except Exception as e:
+        print(f"Error fetching quotes: {e}")
+        return error_response({'error': 'Failed to fetch quotes'}, 500)
+
+@async_route('/api/orders')
+@async_etag_for('orders', 'clients')
+async def get_orders():
+    try:
+        fields = requested_fields(Order)
+        query = apply_filters(order_list_query(fields=fields), ORDER_FILTERS, Order.created_at)
+        return await paginated_response(query, ORDER_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return error_response({'error': str(e)}, 400)
+    except Exception as e:
+        print(f"Error fetching orders: {e}")
+        return error_response({'error': 'Failed to fetch orders'}, 500)
+
+@async_route('/api/transactions')
+@async_etag_for('transactions')
+async def get_transactions():
+    try:
+        fields = requested_fields(Transaction)
+        query = apply_filters(
+            list_query(Transaction, fields, TRANSACTION_ORDER), TRANSACTION_FILTERS, Transaction.transaction_date
+        )
+        return await paginated_response(query, TRANSACTION_ORDER, row_serializer(fields), descending=True)
+    except ValueError as e:
+        return error_response({'error': str(e)}, 400)
+    except Exception as e:
+        print(f"Error fetching transactions: {e}")
+        return error_response({'error': 'Failed to fetch transactions'}, 500)
+
+@async_route('/api/dashboard/stats')
+@async_etag_for(*DASHBOARD_TABLES)
+async def get_dashboard_stats():
+    try:
+        return dashboard_response(*await get_cached_dashboard_stats())
+    except Exception as e:
+        print(f"Error fetching dashboard stats: {e}")
+        return error_response({'error': 'Failed to fetch dashboard stats'}, 500)
+
+# ============ APLICAÇÃO ASGI ============
+
+wsgi = WSGIMiddleware(flask_app, workers=WSGI_THREADS)
+# O ProxyFix de app.py (X-Forwarded-Proto/Host), devolvendo o environ reescrito
+proxy_fix = ProxyFix(lambda environ, start_response: environ, **{
+    name: getattr(flask_app.wsgi_app, name) for name in ('x_for', 'x_proto', 'x_host', 'x_port', 'x_prefix')
+})
+
+def log_capacity():
+    """Como o when_ready do gunicorn: conexões por worker e total frente ao orçamento."""
+    sync_pool = (int(os.environ['DB_POOL_SIZE']), int(os.environ['DB_MAX_OVERFLOW']))
+    per_worker = sum(sync_pool) + (sum(ASYNC_POOL) if async_url.get_backend_name() == 'postgresql' else 0)
+    print(
+        f"[EMUNAH] Capacidade ASGI: {WORKERS} workers; pool síncrono {sync_pool[0]}+{sync_pool[1]} "
+        f"({WSGI_THREADS} threads a2wsgi) e assíncrono {ASYNC_POOL[0]}+{ASYNC_POOL[1]} por worker = "
+        f"até {WORKERS * per_worker} conexões (orçamento {connection_budget()})",
+        flush=True
+    )
+    if WORKERS * per_worker > connection_budget():
+        print("[EMUNAH] Pools acima de DB_CONNECTION_BUDGET: confira DB_POOL_SIZE / ASYNC_DB_POOL_SIZE", flush=True)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            print(f"[EMUNAH] ASGI: {len(ASYNC_ROUTES)} rotas assíncronas ({async_url.drivername})", flush=True)
+            log_capacity()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_engine.dispose()
+            archive_worker_metrics()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    view = ASYNC_ROUTES.get(scope['path']) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+    if view is None:
+        return await wsgi(scope, receive, send)
+
+    environ = proxy_fix(build_environ(scope, io.BytesIO()), None)
+    # Contexto de requisição real (não de teste): before_request, after_request,
+    # teardown_request e tratamento de erro do Flask valem também aqui. O
+    # contexto fica só nesta task (contextvars) e sai depois do último chunk.
+    with flask_app.request_context(environ):
+        try:
+            try:
+                response = flask_app.preprocess_request()
+                if response is None:
+                    response = await view()
+            except Exception as e:
+                response = flask_app.handle_user_exception(e)
+            if isinstance(response, StreamingBody):
+                response = flask_app.process_response(response)
+            else:
+                response = flask_app.finalize_request(response)
+        except Exception as e:
+            response = flask_app.handle_exception(e)
+        await send_response(send, response)
@@ -0,0 +1 @@
+"""Benchmarks e verificações de desempenho do backend Flask (não fazem parte do app)."""
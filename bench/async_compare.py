@@ -0,0 +1,101 @@
+"""Compara o caminho síncrono (gunicorn main:app) com o assíncrono (uvicorn asgi:app).
+
+Uso:
+    python -m bench.async_compare --scale 100k --concurrency 200 --output async-100k.json
+    DATABASE_URL=postgresql://... python -m bench.async_compare --skip-seed
+
+Popula o banco uma vez e, para cada servidor, dispara --requests requisições
+por rota de leitura com --concurrency conexões simultâneas. Os dois servidores
+usam o mesmo número de processos (--workers); o gunicorn roda com --threads
+threads por worker. O cliente é o mesmo de bench.load (threads + urllib).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from bench.load import ROOT, free_port, git_commit, peak_rss_kb, run_route, wait_ready
+
+ROUTES = [
+    ('orders', 'GET', '/api/orders', None),
+    ('orders.stage', 'GET', '/api/orders?stage=Corte', None),
+    ('quotes', 'GET', '/api/quotes', None),
+    ('transactions', 'GET', '/api/transactions', None),
+    ('transactions.month', 'GET', '/api/transactions?from={month_ago}&to={today}', None),
+    ('dashboard.stats', 'GET', '/api/dashboard/stats', None),
+]
+
+def server_command(kind, port, args):
+    if kind == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+                '--bind', f'127.0.0.1:{port}', 'main:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(args.workers),
+            '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning']
+
+def measure(kind, routes, env, args):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(server_command(kind, port, args), cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url)
+        results = {route[0]: run_route(base_url, route, args.requests, args.concurrency) for route in routes}
+        rss = peak_rss_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    return {'peakRssKb': rss, 'routes': results}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', default='10k', help='1k, 10k, 100k, 1m ou um inteiro')
+    parser.add_argument('--requests', type=int, default=1000, help='requisições por rota')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='threads por worker do gunicorn')
+    parser.add_argument('--skip-seed', action='store_true', help='reaproveita o banco de DATABASE_URL')
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: stdout)')
+    args = parser.parse_args()
+
+    today = date.today()
+    routes = [
+        (name, method, path.format(today=today.isoformat(), month_ago=(today - timedelta(days=30)).isoformat()), body)
+        for name, method, path, body in ROUTES
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'async.db')}")
+        if not args.skip_seed:
+            subprocess.run([sys.executable, '-m', 'bench.seed', '--scale', args.scale],
+                           cwd=ROOT, env=env, check=True, capture_output=True)
+        servers = {kind: measure(kind, routes, env, args) for kind in ('sync', 'async')}
+
+    report = {
+        'commit': git_commit(),
+        'scale': args.scale,
+        'database': env['DATABASE_URL'].split(':', 1)[0],
+        'config': {
+            'requestsPerRoute': args.requests,
+            'concurrency': args.concurrency,
+            'workers': args.workers,
+            'threads': args.threads
+        },
+        'servers': servers,
+        'throughputRatio': {
+            name: round(servers['async']['routes'][name]['throughputRps'] / servers['sync']['routes'][name]['throughputRps'], 2)
+            for name, _, _, _ in routes
+        }
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
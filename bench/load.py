@@ -0,0 +1,320 @@
+"""Carga concorrente em todas as rotas /api/* com relatório JSON comparável.
+
+Uso:
+    python -m bench.load --scale 100k --concurrency 32 --output bench-100k.json
+    DATABASE_URL=postgresql://... python -m bench.load --scale 1m --skip-seed
+
+Popula o banco (python -m bench.seed, em processo separado), sobe o gunicorn
+com main:app e dispara --requests requisições por rota com --concurrency
+clientes simultâneos. O relatório traz p50/p95/p99, vazão e erros por rota,
+o pico de RSS (VmHWM) do master e dos workers e o commit medido.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_counter = itertools.count(1)
+
+def unique():
+    return f'{os.getpid()}-{next(_counter)}'
+
+def rotating(template, values):
+    """Caminho que muda a cada requisição: template com os valores em ciclo."""
+    values = itertools.cycle(values)
+    path = lambda: template.format(next(values))
+    path.template = template
+    return path
+
+# etapas do quadro usadas nas alterações de pedido (seed cria pedidos 1..n/2)
+BOARD_STAGES = ['Corte', 'Estampa', 'Costura', 'Acabamento', 'Qualidade']
+TRANSITION_BATCH = 20
+
+def order_update():
+    n = next(_counter)
+    return {'stage': BOARD_STAGES[n % len(BOARD_STAGES)], 'progress': n % 101}
+
+def stage_transitions():
+    n = next(_counter)
+    first = (n * TRANSITION_BATCH) % 400 + 1
+    stage = BOARD_STAGES[n % len(BOARD_STAGES)]
+    return {'transitions': [{'id': order_id, 'stage': stage} for order_id in range(first, first + TRANSITION_BATCH)]}
+
+def quote_conversion():
+    n = next(_counter)
+    return {'priority': ['Normal', 'Alta', 'Urgente'][n % 3],
+            'deliveryDate': (date.today() + timedelta(days=n % 60)).isoformat()}
+
+def png_image(n, size=256):
+    """PNG size x size com a cor derivada de n: conteúdo (e chave no repositório) diferente para cada n."""
+    color = bytes(((n >> 16) & 255, (n >> 8) & 255, n & 255))
+    raw = b''.join(b'\x00' + color * size for _ in range(size))
+    chunk = lambda kind, data: (struct.pack('>I', len(data)) + kind + data
+                                + struct.pack('>I', zlib.crc32(kind + data)))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+def multipart_file(field, filename, data, content_type):
+    """Corpo multipart/form-data com um arquivo -> (bytes, Content-Type)."""
+    boundary = f'bench-{unique()}'
+    head = (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n')
+    return head.encode() + data + f'\r\n--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+# imagens enviadas antes das rotas images.* (upload_sample_images); os uploads
+# da rota prints.upload usam cores a partir de UPLOAD_IMAGE_OFFSET
+SAMPLE_IMAGES = range(1, 21)
+SAMPLE_IMAGE_KEYS = [f'{hashlib.sha256(png_image(n)).hexdigest()}.png' for n in SAMPLE_IMAGES]
+UPLOAD_IMAGE_OFFSET = 1000
+
+def print_upload():
+    return multipart_file('file', 'estampa.png', png_image(UPLOAD_IMAGE_OFFSET + next(_counter)), 'image/png')
+
+# (nome, método, caminho, corpo) — o corpo é uma função para gerar valores únicos
+# (JSON, ou (bytes, Content-Type) para outros formatos);
+# o caminho também pode ser uma função (rotating) para variar o registro alterado
+ROUTES = [
+    ('health', 'GET', '/api/health', None),
+    ('clients', 'GET', '/api/clients', None),
+    ('clients.all', 'GET', '/api/clients?all=true', None),
+    ('suppliers', 'GET', '/api/suppliers', None),
+    ('products', 'GET', '/api/products', None),
+    ('products.picker', 'GET', '/api/products?all=true&fields=id,name,price', None),
+    ('prints', 'GET', '/api/prints', None),
+    ('quotes', 'GET', '/api/quotes', None),
+    ('quotes.pending', 'GET', '/api/quotes?status=Pendente', None),
+    ('orders', 'GET', '/api/orders', None),
+    ('orders.stage', 'GET', '/api/orders?stage=Corte', None),
+    ('orders.board', 'GET', '/api/orders/board', None),
+    ('transactions', 'GET', '/api/transactions', None),
+    ('transactions.month', 'GET', '/api/transactions?from={month_ago}&to={today}', None),
+    ('dashboard.stats', 'GET', '/api/dashboard/stats', None),
+    ('dashboard.timeseries', 'GET', '/api/dashboard/timeseries?days=365', None),
+    ('reports.cashflow', 'GET', '/api/reports/cashflow?groupBy=month,type', None),
+    ('search', 'GET', '/api/search?q=camiseta', None),
+    ('search.number', 'GET', '/api/search?q=PED-S-0000042', None),
+    ('export.transactions', 'GET', '/api/export/transactions.csv?from={month_ago}&to={today}', None),
+    ('export.orders', 'GET', '/api/export/orders.xlsx', None),
+    ('export.quotes', 'GET', '/api/export/quotes.csv?status=Pendente', None),
+    ('metrics', 'GET', '/api/metrics', None),
+    ('cache.stats', 'GET', '/api/cache/stats', None),
+    ('clients.create', 'POST', '/api/clients', lambda: {'name': f'Cliente carga {unique()}'}),
+    ('suppliers.create', 'POST', '/api/suppliers', lambda: {'name': f'Fornecedor carga {unique()}'}),
+    ('products.create', 'POST', '/api/products',
+     lambda: {'name': 'Camiseta carga', 'sku': f'LOAD-{unique()}', 'price': 49.9, 'cost': 20}),
+    ('prints.create', 'POST', '/api/prints', lambda: {'name': f'Estampa carga {unique()}'}),
+    ('quotes.create', 'POST', '/api/quotes', lambda: {'clientId': 1, 'itemsSummary': '50x Camiseta', 'totalValue': 1500}),
+    ('orders.create', 'POST', '/api/orders', lambda: {'clientId': 1, 'itemsSummary': '50x Camiseta', 'totalValue': 1500}),
+    ('transactions.create', 'POST', '/api/transactions',
+     lambda: {'description': 'Venda carga', 'type': 'income', 'amount': 100, 'status': 'Confirmado'}),
+    ('transactions.bulk', 'POST', '/api/transactions/bulk',
+     lambda: [{'description': f'Extrato {i}', 'type': 'expense', 'amount': 10} for i in range(50)]),
+    ('clients.bulk', 'POST', '/api/clients/bulk',
+     lambda: [{'name': f'Cliente importado {unique()}', 'email': f'importado{i}@exemplo.com.br'} for i in range(50)]),
+    ('products.bulk', 'POST', '/api/products/bulk',
+     lambda: [{'name': f'Camiseta importada {i}', 'sku': f'BULK-{unique()}', 'price': 59.9, 'cost': 22}
+              for i in range(50)]),
+    ('orders.update', 'PATCH', rotating('/api/orders/{}', range(1, 401)), order_update),
+    ('orders.transitions', 'POST', '/api/orders/stage-transitions', stage_transitions),
+    # cotações com cliente e sem pedido no seed (id = 2 mod 4); repetir a conversão devolve o mesmo pedido
+    ('quotes.convert', 'POST', rotating('/api/quotes/{}/convert', range(2, 402, 4)), quote_conversion),
+    ('prints.upload', 'POST', '/api/prints/upload', print_upload),
+    ('images.get', 'GET', rotating('/api/images/{}', SAMPLE_IMAGE_KEYS), None),
+    ('images.thumb', 'GET', rotating('/api/images/{}/thumb?w=160', SAMPLE_IMAGE_KEYS), None),
+]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            for child in f.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+def peak_rss_kb(pid):
+    """VmHWM (pico de RSS) do master e de cada worker; só Linux."""
+    peaks = {}
+    for p in process_tree(pid):
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peaks[p] = int(line.split()[1])
+        except OSError:
+            pass
+    return {'max': max(peaks.values()), 'total': sum(peaks.values())} if peaks else None
+
+def request_once(base_url, method, path, body):
+    payload = body() if body else None
+    if isinstance(payload, tuple):
+        data, content_type = payload
+    else:
+        data, content_type = (json.dumps(payload).encode() if body else None), 'application/json'
+    req = urllib.request.Request(base_url + (path() if callable(path) else path), data=data, method=method,
+                                 headers={'Content-Type': content_type})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            ok = response.status < 400
+    except urllib.error.HTTPError as e:
+        e.read()
+        ok = False
+    except OSError:
+        ok = False
+    return time.perf_counter() - started, ok
+
+def run_route(base_url, route, requests, concurrency):
+    name, method, path, body = route
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def worker(_):
+        nonlocal errors
+        elapsed, ok = request_once(base_url, method, path, body)
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'method': method,
+        'path': getattr(path, 'template', path),
+        'requests': requests,
+        'errors': errors,
+        'throughputRps': round(requests / wall, 2),
+        'latencyMs': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean': round(statistics.fmean(latencies) * 1000, 2),
+        }
+    }
+
+def upload_sample_images(base_url):
+    for n in SAMPLE_IMAGES:
+        _, ok = request_once(base_url, 'POST', '/api/prints/upload',
+                             lambda: multipart_file('file', 'amostra.png', png_image(n), 'image/png'))
+        if not ok:
+            raise RuntimeError('falha ao enviar as imagens de amostra (/api/prints/upload)')
+
+def wait_ready(base_url, timeout=30):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(base_url + '/api/health', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('servidor não subiu')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', default='1k', help='1k, 10k, 100k, 1m ou um inteiro')
+    parser.add_argument('--requests', type=int, default=200, help='requisições por rota')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--routes', help='nomes separados por vírgula (padrão: todas)')
+    parser.add_argument('--skip-seed', action='store_true', help='reaproveita o banco de DATABASE_URL')
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: stdout)')
+    args = parser.parse_args()
+
+    selected = set(args.routes.split(',')) if args.routes else None
+    today = date.today()
+    routes = [
+        (name, method, path.format(today=today.isoformat(), month_ago=(today - timedelta(days=30)).isoformat())
+         if isinstance(path, str) else path, body)
+        for name, method, path, body in ROUTES if not selected or name in selected
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'load.db')}")
+        # uploads da carga num diretório descartável, não em storage/images do projeto
+        env.setdefault('IMAGE_STORAGE_PATH', os.path.join(tmp, 'images'))
+        if not args.skip_seed:
+            subprocess.run([sys.executable, '-m', 'bench.seed', '--scale', args.scale],
+                           cwd=ROOT, env=env, check=True, capture_output=True)
+
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+             '--bind', f'127.0.0.1:{port}', 'main:app'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(base_url)
+            if any(name.startswith('images.') for name, *_ in routes):
+                upload_sample_images(base_url)
+            results = {route[0]: run_route(base_url, route, args.requests, args.concurrency) for route in routes}
+            rss = peak_rss_kb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'commit': git_commit(),
+        'scale': args.scale,
+        'database': env['DATABASE_URL'].split(':', 1)[0],
+        'config': {
+            'requestsPerRoute': args.requests,
+            'concurrency': args.concurrency,
+            'workers': args.workers,
+            'threads': args.threads
+        },
+        'peakRssKb': rss,
+        'routes': results
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Numeração de documentos sob concorrência: nenhum número repetido nem pulado.
+
+Uso:
+    python -m bench.numbering --requests 300 --concurrency 64
+    DATABASE_URL=postgresql://... python -m bench.numbering --workers 4
+
+Cria um banco vazio (SQLite temporário por padrão; com DATABASE_URL, use um
+banco descartável), sobe o gunicorn com vários workers e dispara --requests
+POSTs simultâneos em /api/quotes, /api/orders e /api/transactions. Sai com
+código 1 se algum POST falhar, se dois documentos receberem o mesmo número
+ou se a sequência do ano tiver buracos.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from bench.load import ROOT, free_port, wait_ready
+
+# recurso -> (campo do número na resposta, prefixo, corpo do POST)
+RESOURCES = {
+    'quotes': ('quoteNumber', 'COT', lambda client_id: {
+        'clientId': client_id, 'itemsSummary': '10x Camiseta', 'totalValue': 250.0, 'status': 'Pendente'
+    }),
+    'orders': ('orderNumber', 'PED', lambda client_id: {
+        'clientId': client_id, 'itemsSummary': '10x Camiseta', 'totalValue': 250.0
+    }),
+    'transactions': ('transactionNumber', 'TRX', lambda client_id: {
+        'description': 'Venda', 'category': 'Vendas', 'type': 'income', 'amount': 250.0
+    }),
+}
+
+def post(base_url, path, body):
+    req = urllib.request.Request(base_url + path, data=json.dumps(body).encode(), method='POST',
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode(errors='replace')
+    except OSError as e:
+        return None, str(e)
+
+def check_resource(base_url, resource, client_id, requests, concurrency):
+    field, prefix, body = RESOURCES[resource]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: post(base_url, f'/api/{resource}', body(client_id)), range(requests)))
+
+    failures = [result for result in results if result[0] != 201]
+    numbers = [payload[field] for status, payload in results if status == 201]
+    sequence_of = lambda number: int(number.rsplit('-', 1)[1])
+    sequence = sorted(map(sequence_of, numbers))
+    problems = []
+    if failures:
+        problems.append(f'{len(failures)} POSTs falharam (ex.: {failures[0]})')
+    if len(set(numbers)) != len(numbers):
+        problems.append(f'{len(numbers) - len(set(numbers))} números repetidos')
+    if sequence and sequence != list(range(1, len(sequence) + 1)):
+        problems.append('sequência com buracos')
+    if any(not number.startswith(f'{prefix}-{date.today().year}-') for number in numbers):
+        problems.append('prefixo inesperado')
+    return {'resource': resource, 'ok': not problems, 'created': len(numbers),
+            'first': min(numbers, key=sequence_of, default=None),
+            'last': max(numbers, key=sequence_of, default=None), 'problems': problems}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300, help='POSTs por recurso')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'numbering.db')}")
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'init-db'],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+             '--bind', f'127.0.0.1:{port}', 'main:app'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(base_url)
+            status, client = post(base_url, '/api/clients', {'name': 'Igreja Numeração'})
+            assert status == 201, (status, client)
+            report = [check_resource(base_url, resource, client['id'], args.requests, args.concurrency)
+                      for resource in RESOURCES]
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps({'database': env['DATABASE_URL'].split(':', 1)[0], 'workers': args.workers,
+                      'concurrency': args.concurrency, 'checks': report}, indent=2, ensure_ascii=False))
+    sys.exit(0 if all(check['ok'] for check in report) else 1)
+
+if __name__ == '__main__':
+    main()
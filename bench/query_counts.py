@@ -0,0 +1,150 @@
+"""Regressão de N+1: cada rota de listagem emite um número fixo de comandos SQL.
+
+Uso:
+    python -m bench.query_counts
+    DATABASE_URL=postgresql://... python -m bench.query_counts --scale 10k
+
+Popula o banco com bench.seed (SQLite temporário por padrão) e chama cada
+rota com páginas de tamanhos diferentes, contando todos os comandos emitidos
+(inclusive a leitura de table_versions). Sai com código 1 se alguma rota
+passar do limite em STATEMENT_LIMITS ou se o número de comandos crescer com
+o tamanho da página — sinal de lazy load por linha.
+
+As tabelas começam como eram antes do NOT NULL nas chaves de ordenação, com
+algumas linhas sem data; depois do init-db, percorrer /api/quotes,
+/api/orders e /api/transactions pelo nextCursor tem de devolver todas as linhas.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.seed import load_app, parse_scale, seed  # noqa: E402
+
+# rota -> máximo de comandos por requisição (versões de tabela + SELECT da página)
+STATEMENT_LIMITS = {
+    '/api/clients': 2,
+    '/api/suppliers': 2,
+    '/api/products': 2,
+    '/api/prints': 2,
+    '/api/quotes': 2,
+    '/api/orders': 2,
+    '/api/transactions': 2,
+    # contagem por etapa + UNION ALL das raias
+    '/api/orders/board': 3,
+}
+# variações de cada rota; {limit} muda o tamanho da página
+VARIANTS = ['?limit={limit}', '?all=true&limit={limit}', '?stream=true&limit={limit}', '?fields=id&limit={limit}']
+PAGE_SIZES = (5, 200)
+# rota paginada por cursor -> modelo; uma a cada NULL_EVERY linhas fica sem data
+CURSOR_WALKS = {'/api/quotes': 'Quote', '/api/orders': 'Order', '/api/transactions': 'Transaction'}
+NULL_EVERY = 25
+WALK_PAGE_SIZE = 50
+
+@contextmanager
+def legacy_sort_keys(emunah):
+    """create_all com as chaves de ordenação anuláveis, como nos bancos antigos."""
+    columns = [column for column, _ in emunah.SORT_KEY_BACKFILL]
+    for column in columns:
+        column.nullable = True
+    try:
+        yield
+    finally:
+        for column in columns:
+            column.nullable = False
+
+def blank_sort_keys(emunah):
+    for column, _ in emunah.SORT_KEY_BACKFILL:
+        emunah.db.session.execute(
+            column.table.update().where(column.table.c.id % NULL_EVERY == 0).values({column.name: None})
+        )
+    emunah.db.session.commit()
+
+def walk_cursor(emunah, route, model_name):
+    from sqlalchemy import func, select
+
+    client = emunah.app.test_client()
+    seen, cursor, pages = [], None, 0
+    while True:
+        path = f'{route}?limit={WALK_PAGE_SIZE}&fields=id' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(path)
+        if response.status_code != 200:
+            return {'path': route, 'ok': False, 'problems': [f'{path}: HTTP {response.status_code}']}
+        payload = response.get_json()
+        seen.extend(item['id'] for item in payload['items'])
+        pages += 1
+        cursor = payload['nextCursor']
+        if not cursor:
+            break
+    model = getattr(emunah, model_name)
+    with emunah.app.app_context():
+        total = emunah.db.session.scalar(select(func.count()).select_from(model))
+    problems = []
+    if len(seen) != total:
+        problems.append(f'{total - len(seen)} linhas fora das páginas ({len(seen)} de {total})')
+    if len(set(seen)) != len(seen):
+        problems.append(f'{len(seen) - len(set(seen))} linhas repetidas')
+    return {'path': route + '?cursor=...', 'ok': not problems, 'pages': pages, 'problems': problems}
+
+def count_statements(emunah, path):
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with emunah.app.app_context():
+        engine = emunah.db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = emunah.app.test_client().get(path)
+        response.get_data()  # consome o streaming antes de contar
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, (path, response.status_code)
+    return len(statements)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', default='1k', help='1k, 10k, 100k, 1m ou um inteiro')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'counts.db')}")
+        emunah = load_app()
+        with emunah.app.app_context():
+            with legacy_sort_keys(emunah):
+                emunah.db.create_all()
+            seed(emunah, parse_scale(args.scale))
+            blank_sort_keys(emunah)
+            emunah.init_db()
+
+        report, failed = [], False
+        for route, limit in STATEMENT_LIMITS.items():
+            for variant in VARIANTS:
+                # o quadro não tem ?all nem ?stream
+                if route.endswith('/board') and ('all=' in variant or 'stream=' in variant):
+                    continue
+                counts = {size: count_statements(emunah, route + variant.format(limit=size)) for size in PAGE_SIZES}
+                problems = []
+                if max(counts.values()) > limit:
+                    problems.append(f'{max(counts.values())} comandos (limite {limit})')
+                if len(set(counts.values())) > 1:
+                    problems.append('número de comandos cresce com o tamanho da página')
+                failed = failed or bool(problems)
+                report.append({'path': route + variant.format(limit='N'), 'ok': not problems,
+                               'statements': counts, 'problems': problems})
+        for route, model_name in CURSOR_WALKS.items():
+            check = walk_cursor(emunah, route, model_name)
+            failed = failed or not check['ok']
+            report.append(check)
+
+        print(json.dumps({'scale': args.scale, 'checks': report}, indent=2))
+        sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
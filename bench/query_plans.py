@@ -0,0 +1,145 @@
+"""Regressão de plano de consulta: nenhuma rota quente pode cair em varredura
+sequencial.
+
+Uso:
+    python -m bench.query_plans --scale 100k
+    DATABASE_URL=postgresql://... python -m bench.query_plans
+
+Popula o banco com bench.seed (SQLite temporário por padrão), chama cada rota
+pelo test client capturando o SQL emitido e faz EXPLAIN de cada SELECT.
+Sai com código 1 se algum plano varre a tabela inteira ou ordena sem índice.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.seed import load_app, parse_scale, seed  # noqa: E402
+
+# Contar todos os clientes percorre a tabela por definição
+ALLOWED_FULL_SCANS = {'clients'}
+
+PATHS = [
+    '/api/clients',
+    '/api/suppliers?status=Ativo',
+    '/api/products',
+    '/api/products?fields=id,name,price',
+    '/api/prints',
+    '/api/quotes',
+    '/api/quotes?status=Pendente',
+    '/api/orders',
+    '/api/orders?stage=Corte',
+    '/api/orders/board',
+    '/api/orders/board?fields=id,orderNumber',
+    '/api/orders/board?stage=Corte',
+    '/api/transactions',
+    '/api/transactions?type=income&status=Confirmado',
+    '/api/transactions?from={recent}&to={today}',
+    '/api/dashboard/stats',
+    '/api/export/transactions.csv?from={recent}&to={today}',
+    '/api/export/orders.xlsx?stage=Corte',
+]
+# rotas cuja segunda página (cursor) também é verificada
+PAGED_PATHS = ['/api/quotes', '/api/orders', '/api/transactions', '/api/orders/board?stage=Corte']
+
+def capture_statements(emunah, paths):
+    from sqlalchemy import event
+
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'table_versions' not in statement:
+            captured.append((statement, parameters))
+
+    client = emunah.app.test_client()
+    with emunah.app.app_context():
+        engine = emunah.db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for path in paths:
+            start = len(captured)
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+            yield path, captured[start:]
+            if path in PAGED_PATHS and response.json.get('nextCursor'):
+                start = len(captured)
+                separator = '&' if '?' in path else '?'
+                client.get(f"{path}{separator}cursor={response.json['nextCursor']}")
+                yield f'{path} (página 2)', captured[start:]
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def primary_key_page_scan(statement, table, sorts):
+    """Primeira página sem filtro, na ordem da chave primária: o SCAN para no LIMIT.
+
+    Com WHERE a varredura pode percorrer a tabela inteira atrás das linhas
+    que casam, então só o caso sem filtro algum fica isento.
+    """
+    upper = ' '.join(statement.upper().split())
+    return (not sorts and ' WHERE ' not in upper and ' LIMIT ' in upper
+            and re.search(rf'ORDER BY {re.escape(table.upper())}\.ID( ASC| DESC)?( LIMIT|$)', upper) is not None)
+
+def sqlite_problems(conn, statement, parameters):
+    plan = [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+    problems = []
+    sorts = [d for d in plan if 'TEMP B-TREE' in d]
+    problems.extend(sorts)
+    # SCAN de subconsulta (raias do quadro) lê o resultado já limitado, não uma tabela
+    subqueries = {d.split()[1] for d in plan if d.startswith(('CO-ROUTINE ', 'MATERIALIZE '))}
+    for detail in plan:
+        if not detail.startswith('SCAN ') or 'INDEX' in detail or detail == 'SCAN CONSTANT ROW':
+            continue
+        table = detail.split()[1]
+        if table in ALLOWED_FULL_SCANS or table in subqueries or primary_key_page_scan(statement, table, sorts):
+            continue
+        problems.append(detail)
+    return plan, problems
+
+def postgresql_problems(conn, statement, parameters):
+    result = conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+    plan = result[0]['Plan'] if isinstance(result, list) else json.loads(result)[0]['Plan']
+    problems = []
+
+    def walk(node):
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') not in ALLOWED_FULL_SCANS:
+            problems.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan)
+    return plan, problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', default='100k', help='1k, 10k, 100k, 1m ou um inteiro')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        emunah = load_app()
+        with emunah.app.app_context():
+            emunah.init_db()
+            seed(emunah, parse_scale(args.scale))
+
+        today = date.today()
+        paths = [p.format(today=today.isoformat(), recent=(today - timedelta(days=30)).isoformat()) for p in PATHS]
+        report, failed = [], False
+        with emunah.app.app_context():
+            dialect = emunah.db.engine.dialect.name
+            check = postgresql_problems if dialect == 'postgresql' else sqlite_problems
+            for path, statements in capture_statements(emunah, paths):
+                with emunah.db.engine.connect() as conn:
+                    for statement, parameters in statements:
+                        plan, problems = check(conn, statement, parameters)
+                        failed = failed or bool(problems)
+                        report.append({'path': path, 'ok': not problems, 'problems': problems, 'plan': plan})
+
+        print(json.dumps({'dialect': dialect, 'scale': args.scale, 'checks': report}, indent=2, default=str))
+        sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Gerador de dados sintéticos para os sete modelos.
+
+Uso:
+    python -m bench.seed --scale 100k
+    DATABASE_URL=postgresql://... python -m bench.seed --scale 1m
+
+A escala é o número de transações; os demais modelos são proporcionais
+(clientes = n/10, cotações e pedidos = n/2, catálogo = n/100). Os dados são
+determinísticos (semente fixa) para que execuções em commits diferentes
+sejam comparáveis.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+CHUNK_SIZE = 10000
+
+STAGES = ['Aguardando', 'Corte', 'Estampa', 'Costura', 'Acabamento', 'Entregue']
+QUOTE_STATUSES = ['Rascunho', 'Pendente', 'Aprovado', 'Recusado']
+CATEGORIES = ['Camisetas', 'Moletons', 'Bonés', 'Ecobags']
+TRANSACTION_CATEGORIES = ['Vendas', 'Matéria-prima', 'Fornecedores', 'Frete', 'Marketing']
+FIRST_NAMES = ['João', 'Maria', 'José', 'Ana', 'Antônio', 'Francisca', 'Gabriel', 'Débora', 'Cecília', 'Luís']
+CHURCHES = ['Igreja Batista', 'Assembleia de Deus', 'Igreja Presbiteriana', 'Comunidade Evangélica']
+
+def parse_scale(value):
+    value = str(value).lower()
+    return SCALES[value] if value in SCALES else int(value)
+
+def load_app():
+    sys.path.insert(0, ROOT)
+    import app as emunah
+    return emunah
+
+def insert(emunah, model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        emunah.db.session.execute(model.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+def seed(emunah, scale, rng_seed=42):
+    """Popula o banco da app (dentro de um app_context) e roda ANALYZE."""
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    today = date.today()
+    n = max(scale, 10)
+    clients = max(n // 10, 10)
+    catalog = max(n // 100, 20)
+    quotes = max(n // 2, 5)
+    orders = max(n // 2, 5)
+
+    insert(emunah, emunah.Client, [{
+        'name': f'{rng.choice(CHURCHES)} {rng.choice(FIRST_NAMES)} {i}',
+        'contact': rng.choice(FIRST_NAMES),
+        'email': f'cliente{i}@exemplo.com.br',
+        'phone': f'(11) 9{i % 10000:04d}-{i % 7919:04d}',
+        'created_at': now - timedelta(minutes=clients - i)
+    } for i in range(1, clients + 1)])
+    insert(emunah, emunah.Supplier, [{
+        'name': f'Fornecedor {i}',
+        'category': rng.choice(CATEGORIES),
+        'status': 'Ativo' if i % 5 else 'Inativo',
+        'rating': rng.randint(1, 5),
+        'production_time_days': rng.randint(3, 20)
+    } for i in range(1, max(n // 1000, 10) + 1)])
+    insert(emunah, emunah.Product, [{
+        'name': f'{rng.choice(CATEGORIES)} modelo {i}',
+        'sku': f'SKU-S-{i:07d}',
+        'category': rng.choice(CATEGORIES),
+        'price': rng.randint(3000, 15000) / 100,
+        'cost': rng.randint(1000, 3000) / 100,
+        'stock': rng.randint(0, 500),
+        'colors': ['Preto', 'Branco', 'Azul'][:rng.randint(1, 3)],
+        'sizes': ['P', 'M', 'G', 'GG']
+    } for i in range(1, catalog + 1)])
+    insert(emunah, emunah.Print, [{
+        'name': f'Estampa {i}',
+        'technique': rng.choice(['Silk', 'DTF', 'Sublimação', 'Bordado']),
+        'colors': 'Preto e branco',
+        'image_url': f'https://exemplo.com.br/estampas/{i}.png',
+        'image_type': 'url',
+        'tags': ['fé', 'culto', 'jovens'][:rng.randint(1, 3)]
+    } for i in range(1, catalog + 1)])
+    insert(emunah, emunah.Quote, [{
+        'quote_number': f'COT-S-{i:07d}',
+        'client_id': rng.randint(1, clients) if i % 4 else None,
+        'lead_name': None if i % 4 else f'Lead {i}',
+        'lead_contact': None if i % 4 else f'(11) 98888-{i % 10000:04d}',
+        'items_summary': f'{rng.randint(10, 300)}x Camiseta',
+        'total_value': rng.randint(50000, 900000) / 100,
+        'status': rng.choice(QUOTE_STATUSES),
+        'created_at': now - timedelta(minutes=quotes - i)
+    } for i in range(1, quotes + 1)])
+    insert(emunah, emunah.Order, [{
+        'order_number': f'PED-S-{i:07d}',
+        'quote_id': i if i % 2 else None,
+        'client_id': rng.randint(1, clients),
+        'items_summary': f'{rng.randint(10, 300)}x Camiseta',
+        'total_value': rng.randint(50000, 900000) / 100,
+        'delivery_date': today + timedelta(days=rng.randint(-60, 60)),
+        'stage': rng.choice(STAGES),
+        'progress': rng.randint(0, 100),
+        'priority': 'Alta' if i % 7 == 0 else 'Normal',
+        'created_at': now - timedelta(minutes=orders - i)
+    } for i in range(1, orders + 1)])
+    insert(emunah, emunah.Transaction, [{
+        'transaction_number': f'TRX-S-{i:08d}',
+        'order_id': rng.randint(1, orders) if i % 3 == 0 else None,
+        'description': f'Lançamento {i}',
+        'category': rng.choice(TRANSACTION_CATEGORIES),
+        'type': 'income' if rng.random() < 0.6 else 'expense',
+        'amount': rng.randint(1000, 500000) / 100,
+        'status': rng.choice(['Pendente', 'Confirmado', 'Confirmado']),
+        'transaction_date': today - timedelta(days=rng.randint(0, 1500)),
+        'created_at': now
+    } for i in range(1, n + 1)])
+    emunah.db.session.commit()
+    emunah.rebuild_search_index()
+    emunah.rebuild_cashflow()
+    emunah.rebuild_daily_stats()
+    emunah.db.session.execute(emunah.db.text('ANALYZE'))
+    emunah.db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', default='1k', help='1k, 10k, 100k, 1m ou um inteiro')
+    args = parser.parse_args()
+
+    emunah = load_app()
+    with emunah.app.app_context():
+        emunah.init_db()
+        seed(emunah, parse_scale(args.scale))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Tempo até a primeira requisição de um worker gunicorn.
+
+Uso:
+    python -m bench.startup --runs 5
+    DATABASE_URL=postgresql://... python -m bench.startup
+
+Roda `flask --app main init-db` uma vez (como no deploy) e então, a cada
+execução, sobe `gunicorn -w 1 main:app` e mede o tempo até o primeiro
+200 em /api/clients, que já inclui a primeira conexão com o banco. Também
+mede o tempo de `import main` isolado.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def import_seconds(env):
+    code = 'import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)'
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+def first_request_seconds(env, path, timeout):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', '1', '--bind', f'127.0.0.1:{port}', 'main:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f'worker não respondeu em {timeout}s')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/clients')
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'init-db'],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+
+        imports = [import_seconds(env) for _ in range(args.runs)]
+        firsts = [first_request_seconds(env, args.path, args.timeout) for _ in range(args.runs)]
+        print(json.dumps({
+            'runs': args.runs,
+            'path': args.path,
+            'importSeconds': {'median': statistics.median(imports), 'max': max(imports)},
+            'timeToFirstRequestSeconds': {'median': statistics.median(firsts), 'max': max(firsts)}
+        }, indent=2))
+
+if __name__ == '__main__':
+    main()
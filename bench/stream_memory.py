@@ -0,0 +1,73 @@
+"""Pico de RSS de /api/transactions e /api/orders: lista completa vs streaming.
+
+Uso:
+    python -m bench.stream_memory --rows 200000
+
+A carga e cada medição rodam em processos separados sobre o mesmo SQLite
+temporário (ru_maxrss é herdado no exec, então o processo pai não toca no app).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.seed import load_app, seed  # noqa: E402
+
+def app_for(db_path):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    return load_app()
+
+def seed_db(db_path, scale):
+    emunah = app_for(db_path)
+    with emunah.app.app_context():
+        emunah.init_db()
+        seed(emunah, scale)
+
+def measure(db_path, path):
+    emunah = app_for(db_path)
+    client = emunah.app.test_client()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    response = client.get(path, buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'path': path, 'bytes': size, 'baselineKb': baseline, 'peakKb': peak}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', nargs=2, metavar=('DB', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_db(args.seed, args.rows)
+        return
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        subprocess.run([sys.executable, __file__, '--rows', str(args.rows), '--seed', db_path],
+                       check=True, capture_output=True)
+        results = []
+        for resource_path in ('/api/transactions', '/api/orders'):
+            for mode in ('all', 'stream'):
+                out = subprocess.run(
+                    [sys.executable, __file__, '--measure', db_path, f'{resource_path}?{mode}=true'],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                result['mode'] = mode
+                results.append(result)
+        print(json.dumps({'rows': args.rows, 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
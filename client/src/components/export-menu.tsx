@@ -0,0 +1,30 @@
+import { Button } from "@/components/ui/button";
+import {
+  DropdownMenu,
+  DropdownMenuContent,
+  DropdownMenuItem,
+  DropdownMenuTrigger,
+} from "@/components/ui/dropdown-menu";
+import { exportUrl } from "@/lib/api";
+import { Download } from "lucide-react";
+
+// Links diretos: o navegador baixa o arquivo em streaming, sem passar pelo fetch
+export function ExportMenu({ resource }: { resource: Parameters<typeof exportUrl>[0] }) {
+  return (
+    <DropdownMenu>
+      <DropdownMenuTrigger asChild>
+        <Button variant="outline" data-testid={`button-export-${resource}`}>
+          <Download className="mr-2 h-4 w-4" /> Exportar
+        </Button>
+      </DropdownMenuTrigger>
+      <DropdownMenuContent align="end">
+        <DropdownMenuItem asChild>
+          <a href={exportUrl(resource, 'csv')} download>CSV</a>
+        </DropdownMenuItem>
+        <DropdownMenuItem asChild>
+          <a href={exportUrl(resource, 'xlsx')} download>Excel (XLSX)</a>
+        </DropdownMenuItem>
+      </DropdownMenuContent>
+    </DropdownMenu>
+  );
+}
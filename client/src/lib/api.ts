@@ -11,7 +11,8 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
   
   if (!response.ok) {
     const error = await response.json().catch(() => ({ message: 'Erro de rede' }));
-    throw new Error(error.message || `HTTP ${response.status}`);
+    // o servidor responde {error: ...}; 409 de pedido alterado chega com a mensagem
+    throw new Error(error.error || error.message || `HTTP ${response.status}`);
   }
   
   return response.json();
@@ -27,6 +28,25 @@ export interface DashboardStats {
 
 export const getDashboardStats = () => fetchApi<DashboardStats>('/dashboard/stats');
 
+export interface DashboardDay {
+  date: string;
+  revenue: number;
+  quotes: number;
+  orders: number;
+  convertedOrders: number;
+  conversionRate: number | null;
+}
+
+export interface DashboardTimeseries {
+  from: string;
+  to: string;
+  series: DashboardDay[];
+  totals: Omit<DashboardDay, 'date'>;
+}
+
+export const getDashboardTimeseries = (days: 30 | 90 | 365 = 30) =>
+  fetchApi<DashboardTimeseries>(`/dashboard/timeseries?days=${days}`);
+
 // Clients
 export interface Client {
   id: number;
@@ -37,7 +57,7 @@ export interface Client {
   address: string;
 }
 
-export const getClients = () => fetchApi<Client[]>('/clients');
+export const getClients = () => fetchApi<Client[]>('/clients?all=true');
 export const createClient = (data: Omit<Client, 'id'>) => 
   fetchApi<{id: number}>('/clients', { method: 'POST', body: JSON.stringify(data) });
 
@@ -53,7 +73,7 @@ export interface Supplier {
   rating: number;
 }
 
-export const getSuppliers = () => fetchApi<Supplier[]>('/suppliers');
+export const getSuppliers = () => fetchApi<Supplier[]>('/suppliers?all=true');
 export const createSupplier = (data: Omit<Supplier, 'id'>) => 
   fetchApi<{id: number}>('/suppliers', { method: 'POST', body: JSON.stringify(data) });
 
@@ -70,7 +90,10 @@ export interface Product {
   sizes: string[];
 }
 
-export const getProducts = () => fetchApi<Product[]>('/products');
+export const getProducts = () => fetchApi<Product[]>('/products?all=true');
+// Seletor da cotação: só as colunas usadas (?fields= vira projeção no SELECT)
+export const getProductOptions = () =>
+  fetchApi<Pick<Product, 'id' | 'name' | 'price'>[]>('/products?all=true&fields=id,name,price');
 export const createProduct = (data: Omit<Product, 'id'>) => 
   fetchApi<{id: number}>('/products', { method: 'POST', body: JSON.stringify(data) });
 
@@ -82,13 +105,24 @@ export interface PrintItem {
   colors: string;
   imageUrl: string;
   imageType: string;
+  thumbnailUrl: string | null;
+  imageWidth: number | null;
+  imageHeight: number | null;
   tags: string[];
 }
 
-export const getPrints = () => fetchApi<PrintItem[]>('/prints');
-export const createPrint = (data: Omit<PrintItem, 'id'>) => 
+export const getPrints = () => fetchApi<PrintItem[]>('/prints?all=true');
+export const createPrint = (data: Omit<PrintItem, 'id' | 'thumbnailUrl' | 'imageWidth' | 'imageHeight'>) => 
   fetchApi<{id: number}>('/prints', { method: 'POST', body: JSON.stringify(data) });
-export const uploadPrintFile = async (file: File): Promise<{url: string}> => {
+export interface UploadedImage {
+  key: string;
+  url: string;
+  thumbnailUrl: string;
+  width: number;
+  height: number;
+}
+
+export const uploadPrintFile = async (file: File): Promise<UploadedImage> => {
   const formData = new FormData();
   formData.append('file', file);
   const response = await fetch(`${API_BASE}/prints/upload`, {
@@ -112,7 +146,7 @@ export interface Quote {
   date: string;
 }
 
-export const getQuotes = () => fetchApi<Quote[]>('/quotes');
+export const getQuotes = () => fetchApi<Quote[]>('/quotes?all=true');
 export const createQuote = (data: {
   clientId?: number;
   leadName?: string;
@@ -121,6 +155,11 @@ export const createQuote = (data: {
   totalValue: number;
   status?: string;
 }) => fetchApi<{id: number; quoteNumber: string}>('/quotes', { method: 'POST', body: JSON.stringify(data) });
+export const convertQuote = (id: number, data: { priority?: string; deliveryDate?: string } = {}) =>
+  fetchApi<{id: number; orderNumber: string; quoteId: number; alreadyConverted: boolean}>(`/quotes/${id}/convert`, {
+    method: 'POST',
+    body: JSON.stringify(data),
+  });
 
 // Orders
 export interface Order {
@@ -133,9 +172,37 @@ export interface Order {
   stage: string;
   progress: number;
   priority: string;
+  version: number;
+}
+
+export const getOrders = () => fetchApi<Order[]>('/orders?stream=true');
+
+export interface OrderLane {
+  stage: string;
+  count?: number;
+  items: Order[];
+  nextCursor: string | null;
+}
+
+export interface OrderChange {
+  stage?: string;
+  progress?: number;
+  priority?: string;
+  deliveryDate?: string | null;
+  version?: number;
 }
 
-export const getOrders = () => fetchApi<Order[]>('/orders');
+export const updateOrder = (id: number, data: OrderChange) =>
+  fetchApi<{id: number; version: number}>(`/orders/${id}`, { method: 'PATCH', body: JSON.stringify(data) });
+export const transitionOrders = (transitions: (OrderChange & { id: number })[]) =>
+  fetchApi<{updated: number; versions: Record<string, number>}>('/orders/stage-transitions', {
+    method: 'POST',
+    body: JSON.stringify({ transitions }),
+  });
+
+export const getOrderBoard = (limit = 20) => fetchApi<{lanes: OrderLane[]}>(`/orders/board?limit=${limit}`);
+export const getOrderLane = (stage: string, cursor: string, limit = 20) =>
+  fetchApi<OrderLane>(`/orders/board?${new URLSearchParams({ stage, cursor, limit: String(limit) })}`);
 export const createOrder = (data: {
   quoteId?: number;
   clientId: number;
@@ -158,7 +225,7 @@ export interface Transaction {
   date: string;
 }
 
-export const getTransactions = () => fetchApi<Transaction[]>('/transactions');
+export const getTransactions = () => fetchApi<Transaction[]>('/transactions?stream=true');
 export const createTransaction = (data: {
   orderId?: number;
   description: string;
@@ -168,3 +235,51 @@ export const createTransaction = (data: {
   status?: string;
   date?: string;
 }) => fetchApi<{id: number; transactionNumber: string}>('/transactions', { method: 'POST', body: JSON.stringify(data) });
+
+// Search
+export interface SearchResult {
+  type: 'client' | 'product' | 'print' | 'order' | 'quote';
+  id: number;
+  title: string;
+  subtitle: string | null;
+}
+
+export const search = (q: string, types?: SearchResult['type'][]) => {
+  const params = new URLSearchParams({ q });
+  if (types?.length) params.set('types', types.join(','));
+  return fetchApi<{items: SearchResult[]}>(`/search?${params}`);
+};
+
+// Export (download direto: o navegador recebe o arquivo em streaming)
+export const exportUrl = (
+  resource: 'transactions' | 'orders' | 'quotes',
+  format: 'csv' | 'xlsx',
+  filters: Record<string, string> = {}
+) => {
+  const query = new URLSearchParams(filters).toString();
+  return `${API_BASE}/export/${resource}.${format}${query ? `?${query}` : ''}`;
+};
+
+// Reports
+export interface CashflowRow {
+  month?: string;
+  type?: 'income' | 'expense';
+  category?: string | null;
+  status?: string | null;
+  amount: number;
+  count: number;
+}
+
+export interface CashflowReport {
+  groupBy: string[];
+  rows: CashflowRow[];
+  totals: { income: number; expense: number; net: number };
+}
+
+export const getCashflowReport = (params: { from?: string; to?: string; groupBy?: string[] } = {}) => {
+  const query = new URLSearchParams();
+  if (params.from) query.set('from', params.from);
+  if (params.to) query.set('to', params.to);
+  if (params.groupBy?.length) query.set('groupBy', params.groupBy.join(','));
+  return fetchApi<CashflowReport>(`/reports/cashflow?${query}`);
+};
@@ -1,7 +1,7 @@
 import { Layout } from "@/components/layout";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { useQuery } from "@tanstack/react-query";
-import { getDashboardStats, getOrders, getTransactions } from "@/lib/api";
+import { getDashboardStats, getDashboardTimeseries, getOrders, getTransactions } from "@/lib/api";
 import { 
   DollarSign, 
   Users, 
@@ -15,15 +15,8 @@ import {
 } from "lucide-react";
 import { Area, AreaChart, ResponsiveContainer, Tooltip, XAxis, YAxis, CartesianGrid } from "recharts";
 
-const chartData = [
-  { name: "Jan", total: 12000 },
-  { name: "Fev", total: 18000 },
-  { name: "Mar", total: 15000 },
-  { name: "Abr", total: 24000 },
-  { name: "Mai", total: 28000 },
-  { name: "Jun", total: 32000 },
-  { name: "Jul", total: 29000 },
-];
+// 2026-10-18 -> 18/10
+const formatDay = (isoDate: string) => isoDate.slice(8, 10) + '/' + isoDate.slice(5, 7);
 
 export default function Dashboard() {
   const { data: stats, isLoading: statsLoading } = useQuery({
@@ -31,6 +24,13 @@ export default function Dashboard() {
     queryFn: getDashboardStats
   });
 
+  const { data: timeseries } = useQuery({
+    queryKey: ['/api/dashboard/timeseries', 30],
+    queryFn: () => getDashboardTimeseries(30)
+  });
+
+  const chartData = (timeseries?.series ?? []).map(day => ({ name: formatDay(day.date), total: day.revenue }));
+
   const { data: orders } = useQuery({
     queryKey: ['/api/orders'],
     queryFn: getOrders
@@ -156,7 +156,7 @@ export default function Dashboard() {
           <CardHeader>
             <CardTitle className="font-serif">Visão Geral de Vendas</CardTitle>
             <CardDescription>
-              Faturamento dos últimos 7 meses.
+              Faturamento diário dos últimos 30 dias.
             </CardDescription>
           </CardHeader>
           <CardContent className="pl-2">
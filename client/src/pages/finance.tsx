@@ -1,20 +1,28 @@
 import { Layout } from "@/components/layout";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card";
+import { ExportMenu } from "@/components/export-menu";
 import { useQuery } from "@tanstack/react-query";
-import { getTransactions, getDashboardStats } from "@/lib/api";
+import { getTransactions, getDashboardStats, getCashflowReport } from "@/lib/api";
 import { Bar, BarChart, ResponsiveContainer, Tooltip, XAxis, YAxis, CartesianGrid, Legend } from "recharts";
-import { ArrowUpRight, ArrowDownRight, DollarSign, CreditCard, Calendar, Download, Loader2 } from "lucide-react";
+import { ArrowUpRight, ArrowDownRight, DollarSign, CreditCard, Calendar, Loader2 } from "lucide-react";
 
-const cashFlowData = [
-  { name: "Seg", income: 2400, expense: 1200 },
-  { name: "Ter", income: 1398, expense: 2100 },
-  { name: "Qua", income: 9800, expense: 1800 },
-  { name: "Qui", income: 3908, expense: 2800 },
-  { name: "Sex", income: 4800, expense: 1900 },
-  { name: "Sáb", income: 3800, expense: 2390 },
-  { name: "Dom", income: 0, expense: 0 },
-];
+const MONTH_NAMES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"];
+const CHART_MONTHS = 6;
+
+// AAAA-MM de `months` meses atrás (hora local)
+const monthsAgo = (months: number) => {
+  const date = new Date();
+  date.setDate(1);
+  date.setMonth(date.getMonth() - months);
+  return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
+};
+
+interface CashFlowMonth {
+  name: string;
+  income: number;
+  expense: number;
+}
 
 export default function Finance() {
   const { data: transactions, isLoading } = useQuery({
@@ -27,6 +35,19 @@ export default function Finance() {
     queryFn: getDashboardStats
   });
 
+  // Rollup mensal (groupBy=month,type): uma linha por mês e tipo, já somada no servidor
+  const { data: cashflow } = useQuery({
+    queryKey: ['/api/reports/cashflow', CHART_MONTHS],
+    queryFn: () => getCashflowReport({ from: monthsAgo(CHART_MONTHS - 1), groupBy: ['month', 'type'] })
+  });
+
+  const cashFlowData = Object.values((cashflow?.rows ?? []).reduce((months, row) => {
+    if (!row.month || !row.type) return months;
+    months[row.month] ??= { name: MONTH_NAMES[Number(row.month.slice(5, 7)) - 1], income: 0, expense: 0 };
+    months[row.month][row.type] += row.amount;
+    return months;
+  }, {} as Record<string, CashFlowMonth>));
+
   const formatCurrency = (value: number) => {
     return new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(value);
   };
@@ -46,9 +67,7 @@ export default function Finance() {
           <Button variant="outline" data-testid="button-period">
             <Calendar className="mr-2 h-4 w-4" /> Dezembro 2024
           </Button>
-          <Button variant="outline" data-testid="button-export">
-            <Download className="mr-2 h-4 w-4" /> Exportar
-          </Button>
+          <ExportMenu resource="transactions" />
         </div>
       </div>
 
@@ -121,8 +140,8 @@ export default function Finance() {
       <div className="grid gap-4 md:grid-cols-7">
         <Card className="col-span-4 border-border/50 shadow-sm">
           <CardHeader>
-            <CardTitle className="font-serif">Fluxo de Caixa Semanal</CardTitle>
-            <CardDescription>Entradas vs Saídas nos últimos 7 dias</CardDescription>
+            <CardTitle className="font-serif">Fluxo de Caixa Mensal</CardTitle>
+            <CardDescription>Entradas vs Saídas nos últimos 6 meses</CardDescription>
           </CardHeader>
           <CardContent>
             <div className="h-[300px] w-full">
@@ -3,9 +3,34 @@ import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
-import { useQuery } from "@tanstack/react-query";
-import { getOrders } from "@/lib/api";
-import { Search, Filter, Clock, CheckCircle2, Scissors, Palette, Package, Loader2 } from "lucide-react";
+import { ExportMenu } from "@/components/export-menu";
+import { useEffect, useState } from "react";
+import { useMutation, useQuery } from "@tanstack/react-query";
+import { queryClient } from "@/lib/queryClient";
+import { useToast } from "@/hooks/use-toast";
+import { getOrderBoard, getOrderLane, transitionOrders, updateOrder, type Order, type OrderLane } from "@/lib/api";
+import {
+  DropdownMenu,
+  DropdownMenuContent,
+  DropdownMenuItem,
+  DropdownMenuLabel,
+  DropdownMenuTrigger,
+} from "@/components/ui/dropdown-menu";
+import { Search, Filter, Clock, CheckCircle2, Scissors, Palette, Package, Loader2, MoreHorizontal, ChevronsRight } from "lucide-react";
+
+// Etapas aceitas por PATCH /orders/<id> e /orders/stage-transitions, na ordem do quadro
+const BOARD_STAGES = ['Aguardando', 'Corte', 'Estampa', 'Costura', 'Acabamento', 'Qualidade', 'Concluído'];
+
+const nextStage = (stage: string) => {
+  const index = BOARD_STAGES.indexOf(stage);
+  return index >= 0 && index < BOARD_STAGES.length - 1 ? BOARD_STAGES[index + 1] : null;
+};
+
+// Quadro, listas e indicadores do dashboard mudam junto com a etapa
+const refreshOrders = () => {
+  queryClient.invalidateQueries({ queryKey: ['/api/orders'] });
+  queryClient.invalidateQueries({ queryKey: ['/api/dashboard/stats'] });
+};
 
 const getStageIcon = (stage: string) => {
   switch (stage) {
@@ -33,27 +58,161 @@ const getStageColor = (stage: string) => {
   }
 };
 
-const getColumnOrders = (orders: any[], column: string) => {
-  return orders.filter(o => {
-    if (column === "Aguardando" && o.progress < 20) return true;
-    if (column === "Produção" && o.progress >= 20 && o.progress < 80) return true;
-    if (column === "Acabamento" && o.progress >= 80 && o.progress < 100) return true;
-    if (column === "Concluído" && o.progress === 100) return true;
-    return false;
+function OrderCard({ order }: { order: Order }) {
+  const StageIcon = getStageIcon(order.stage);
+  const { toast } = useToast();
+  // version: se outra pessoa mexeu no pedido, o servidor responde 409 em vez de sobrescrever
+  const move = useMutation({
+    mutationFn: (stage: string) => updateOrder(order.id, { stage, version: order.version }),
+    onSuccess: refreshOrders,
+    onError: (error: Error) => {
+      toast({ title: "Pedido não movido", description: error.message, variant: "destructive" });
+      refreshOrders();
+    }
   });
-};
 
-export default function Orders() {
-  const { data: orders, isLoading } = useQuery({
-    queryKey: ['/api/orders'],
-    queryFn: getOrders
+  return (
+    <Card className="cursor-pointer hover:shadow-md transition-all border-border/60" data-testid={`card-order-${order.id}`}>
+      <CardHeader className="p-4 pb-2 space-y-0">
+        <div className="flex justify-between items-start">
+          <Badge variant="outline" className="font-mono text-[10px] uppercase tracking-wider">
+            {order.orderNumber}
+          </Badge>
+          {order.priority === "Urgente" && (
+            <Badge className="bg-destructive text-destructive-foreground text-[10px]">Urgente</Badge>
+          )}
+          {order.priority === "Alta" && (
+            <Badge className="bg-amber-500 text-white text-[10px]">Alta</Badge>
+          )}
+          <DropdownMenu>
+            <DropdownMenuTrigger asChild>
+              <Button variant="ghost" className="h-6 w-6 p-0 ml-auto" disabled={move.isPending} data-testid={`button-move-${order.id}`}>
+                <span className="sr-only">Mover pedido</span>
+                {move.isPending ? <Loader2 className="h-3 w-3 animate-spin" /> : <MoreHorizontal className="h-4 w-4" />}
+              </Button>
+            </DropdownMenuTrigger>
+            <DropdownMenuContent align="end">
+              <DropdownMenuLabel>Mover para</DropdownMenuLabel>
+              {BOARD_STAGES.filter(stage => stage !== order.stage).map(stage => (
+                <DropdownMenuItem key={stage} onClick={() => move.mutate(stage)}>{stage}</DropdownMenuItem>
+              ))}
+            </DropdownMenuContent>
+          </DropdownMenu>
+        </div>
+        <CardTitle className="text-base font-medium pt-2 leading-tight">
+          {order.clientName}
+        </CardTitle>
+      </CardHeader>
+      <CardContent className="p-4 pt-2">
+        <p className="text-sm text-muted-foreground mb-3">{order.itemsSummary}</p>
+
+        <div className="space-y-2">
+          <div className="flex justify-between text-xs text-muted-foreground">
+            <span className="flex items-center gap-1">
+              <StageIcon className={`h-3 w-3 ${getStageColor(order.stage)}`} />
+              {order.stage}
+            </span>
+            <span>{order.deliveryDate}</span>
+          </div>
+          <div className="h-1.5 w-full bg-secondary rounded-full overflow-hidden">
+            <div
+              className="h-full bg-primary transition-all duration-500 rounded-full"
+              style={{ width: `${order.progress}%` }}
+            />
+          </div>
+        </div>
+      </CardContent>
+    </Card>
+  );
+}
+
+// Uma raia do quadro: a primeira página vem de /orders/board, as seguintes pelo cursor da raia
+function LaneColumn({ lane }: { lane: OrderLane }) {
+  const [more, setMore] = useState<{ items: Order[]; nextCursor: string | null } | null>(null);
+  const [loading, setLoading] = useState(false);
+
+  // quadro recarregado: a raia volta para a primeira página
+  useEffect(() => setMore(null), [lane]);
+
+  const items = more ? [...lane.items, ...more.items] : lane.items;
+  const nextCursor = more ? more.nextCursor : lane.nextCursor;
+  const advanceTo = nextStage(lane.stage);
+  const { toast } = useToast();
+
+  // Os pedidos carregados da raia vão juntos para a próxima etapa: tudo ou nada
+  const advance = useMutation({
+    mutationFn: () => transitionOrders(items.map(order => ({ id: order.id, version: order.version, stage: advanceTo! }))),
+    onSuccess: (result) => {
+      toast({ title: `${result.updated} pedidos movidos para ${advanceTo}` });
+      refreshOrders();
+    },
+    onError: (error: Error) => {
+      toast({ title: "Nenhum pedido movido", description: error.message, variant: "destructive" });
+      refreshOrders();
+    }
   });
 
-  const formatCurrency = (value: number) => {
-    return new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(value);
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const page = await getOrderLane(lane.stage, nextCursor);
+      setMore({ items: [...(more?.items ?? []), ...page.items], nextCursor: page.nextCursor });
+    } finally {
+      setLoading(false);
+    }
   };
 
-  const columns = ["Aguardando", "Produção", "Acabamento", "Concluído"];
+  return (
+    <div className="space-y-4 w-72 shrink-0" data-testid={`lane-${lane.stage}`}>
+      <div className="flex items-center justify-between">
+        <h3 className="font-serif font-medium text-lg">{lane.stage}</h3>
+        <div className="flex items-center gap-1">
+          <Badge variant="secondary" className="rounded-full px-2 py-0.5 text-xs">
+            {lane.count ?? items.length}
+          </Badge>
+          {advanceTo && items.length > 0 && (
+            <Button
+              variant="ghost"
+              size="icon"
+              className="h-6 w-6"
+              title={`Mover os ${items.length} pedidos carregados para ${advanceTo}`}
+              onClick={() => advance.mutate()}
+              disabled={advance.isPending}
+              data-testid={`button-advance-${lane.stage}`}
+            >
+              {advance.isPending ? <Loader2 className="h-3 w-3 animate-spin" /> : <ChevronsRight className="h-4 w-4" />}
+            </Button>
+          )}
+        </div>
+      </div>
+
+      {items.map(order => <OrderCard key={order.id} order={order} />)}
+
+      {items.length === 0 && (
+        <Card className="border-dashed border-2 border-border/40">
+          <CardContent className="p-4 text-center text-muted-foreground text-sm">
+            Nenhum pedido
+          </CardContent>
+        </Card>
+      )}
+
+      {nextCursor && (
+        <Button variant="ghost" className="w-full text-xs" onClick={loadMore} disabled={loading} data-testid={`button-more-${lane.stage}`}>
+          {loading && <Loader2 className="mr-2 h-3 w-3 animate-spin" />}
+          Carregar mais
+        </Button>
+      )}
+    </div>
+  );
+}
+
+export default function Orders() {
+  // Quadro por etapa: contagem e primeira página de cada raia em uma requisição
+  const { data: board, isLoading } = useQuery({
+    queryKey: ['/api/orders', 'board'],
+    queryFn: () => getOrderBoard()
+  });
 
   return (
     <Layout>
@@ -75,6 +234,7 @@ export default function Orders() {
           <Button variant="outline" size="icon" data-testid="button-filter">
             <Filter className="h-4 w-4" />
           </Button>
+          <ExportMenu resource="orders" />
         </div>
       </div>
 
@@ -83,71 +243,8 @@ export default function Orders() {
           <Loader2 className="h-8 w-8 animate-spin text-muted-foreground" />
         </div>
       ) : (
-        <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-4">
-          {columns.map((col) => {
-            const columnOrders = orders ? getColumnOrders(orders, col) : [];
-            return (
-              <div key={col} className="space-y-4">
-                <div className="flex items-center justify-between">
-                  <h3 className="font-serif font-medium text-lg">{col}</h3>
-                  <Badge variant="secondary" className="rounded-full px-2 py-0.5 text-xs">
-                    {columnOrders.length}
-                  </Badge>
-                </div>
-                
-                {columnOrders.map(order => {
-                  const StageIcon = getStageIcon(order.stage);
-                  return (
-                    <Card key={order.id} className="cursor-pointer hover:shadow-md transition-all border-border/60" data-testid={`card-order-${order.id}`}>
-                      <CardHeader className="p-4 pb-2 space-y-0">
-                        <div className="flex justify-between items-start">
-                          <Badge variant="outline" className="font-mono text-[10px] uppercase tracking-wider">
-                            {order.orderNumber}
-                          </Badge>
-                          {order.priority === "Urgente" && (
-                            <Badge className="bg-destructive text-destructive-foreground text-[10px]">Urgente</Badge>
-                          )}
-                          {order.priority === "Alta" && (
-                            <Badge className="bg-amber-500 text-white text-[10px]">Alta</Badge>
-                          )}
-                        </div>
-                        <CardTitle className="text-base font-medium pt-2 leading-tight">
-                          {order.clientName}
-                        </CardTitle>
-                      </CardHeader>
-                      <CardContent className="p-4 pt-2">
-                        <p className="text-sm text-muted-foreground mb-3">{order.itemsSummary}</p>
-                        
-                        <div className="space-y-2">
-                          <div className="flex justify-between text-xs text-muted-foreground">
-                            <span className="flex items-center gap-1">
-                              <StageIcon className={`h-3 w-3 ${getStageColor(order.stage)}`} />
-                              {order.stage}
-                            </span>
-                            <span>{order.deliveryDate}</span>
-                          </div>
-                          <div className="h-1.5 w-full bg-secondary rounded-full overflow-hidden">
-                            <div 
-                              className="h-full bg-primary transition-all duration-500 rounded-full" 
-                              style={{ width: `${order.progress}%` }}
-                            />
-                          </div>
-                        </div>
-                      </CardContent>
-                    </Card>
-                  );
-                })}
-                
-                {columnOrders.length === 0 && (
-                  <Card className="border-dashed border-2 border-border/40">
-                    <CardContent className="p-4 text-center text-muted-foreground text-sm">
-                      Nenhum pedido
-                    </CardContent>
-                  </Card>
-                )}
-              </div>
-            );
-          })}
+        <div className="flex gap-6 overflow-x-auto pb-4">
+          {board?.lanes.map(lane => <LaneColumn key={lane.stage} lane={lane} />)}
         </div>
       )}
     </Layout>
@@ -121,8 +121,11 @@ export default function Prints() {
               <div className="aspect-[4/3] bg-muted/30 relative overflow-hidden">
                 {print.imageUrl ? (
                   <img 
-                    src={print.imageUrl} 
+                    src={print.thumbnailUrl ? `${print.thumbnailUrl}?w=640` : print.imageUrl} 
                     alt={print.name} 
+                    width={print.imageWidth ?? undefined}
+                    height={print.imageHeight ?? undefined}
+                    loading="lazy"
                     className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
                   />
                 ) : (
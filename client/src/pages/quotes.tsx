@@ -3,8 +3,29 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Badge } from "@/components/ui/badge";
 import { Card, CardContent, CardHeader } from "@/components/ui/card";
-import { useQuery } from "@tanstack/react-query";
-import { getQuotes } from "@/lib/api";
+import { Label } from "@/components/ui/label";
+import { ExportMenu } from "@/components/export-menu";
+import { useState } from "react";
+import { useMutation, useQuery } from "@tanstack/react-query";
+import { queryClient } from "@/lib/queryClient";
+import { useToast } from "@/hooks/use-toast";
+import { convertQuote, createQuote, getClients, getProductOptions, getQuotes } from "@/lib/api";
+import {
+  Dialog,
+  DialogContent,
+  DialogDescription,
+  DialogFooter,
+  DialogHeader,
+  DialogTitle,
+  DialogTrigger,
+} from "@/components/ui/dialog";
+import {
+  Select,
+  SelectContent,
+  SelectItem,
+  SelectTrigger,
+  SelectValue,
+} from "@/components/ui/select";
 import {
   Table,
   TableBody,
@@ -22,7 +43,7 @@ import {
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
 import { Tabs, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { Plus, MoreHorizontal, FileText, Search, Filter, Loader2 } from "lucide-react";
+import { Plus, MoreHorizontal, FileText, Search, Filter, Loader2, X } from "lucide-react";
 
 const getStatusColor = (status: string) => {
   switch (status) {
@@ -30,6 +51,8 @@ const getStatusColor = (status: string) => {
       return 'bg-emerald-100 text-emerald-800 dark:bg-emerald-900/30 dark:text-emerald-400';
     case 'Pendente':
       return 'bg-amber-100 text-amber-800 dark:bg-amber-900/30 dark:text-amber-400';
+    case 'Convertida':
+      return 'bg-violet-100 text-violet-800 dark:bg-violet-900/30 dark:text-violet-400';
     case 'Enviada':
       return 'bg-blue-100 text-blue-800 dark:bg-blue-900/30 dark:text-blue-400';
     case 'Rejeitada':
@@ -39,15 +62,175 @@ const getStatusColor = (status: string) => {
   }
 };
 
+const formatCurrency = (value: number) => {
+  return new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(value);
+};
+
+interface QuoteItem {
+  name: string;
+  price: number;
+  quantity: number;
+}
+
+function NewQuoteDialog() {
+  const { toast } = useToast();
+  const [open, setOpen] = useState(false);
+  const [clientId, setClientId] = useState("");
+  const [leadName, setLeadName] = useState("");
+  const [leadContact, setLeadContact] = useState("");
+  const [productId, setProductId] = useState("");
+  const [quantity, setQuantity] = useState("10");
+  const [items, setItems] = useState<QuoteItem[]>([]);
+
+  // Seletores carregam só com o formulário aberto; produtos vêm só com id, nome e preço
+  const { data: clients } = useQuery({ queryKey: ['/api/clients'], queryFn: getClients, enabled: open });
+  const { data: products } = useQuery({
+    queryKey: ['/api/products', 'options'],
+    queryFn: getProductOptions,
+    enabled: open
+  });
+
+  const total = items.reduce((sum, item) => sum + item.price * item.quantity, 0);
+  const canSubmit = items.length > 0 && (clientId !== "" || leadName.trim() !== "");
+
+  const reset = () => {
+    setClientId("");
+    setLeadName("");
+    setLeadContact("");
+    setProductId("");
+    setQuantity("10");
+    setItems([]);
+  };
+
+  const addItem = () => {
+    const product = products?.find(p => String(p.id) === productId);
+    const amount = parseInt(quantity, 10);
+    if (!product || !(amount > 0)) return;
+    setItems([...items, { name: product.name, price: product.price, quantity: amount }]);
+    setProductId("");
+  };
+
+  const mutation = useMutation({
+    mutationFn: () => createQuote({
+      ...(clientId ? { clientId: Number(clientId) } : { leadName: leadName.trim(), leadContact: leadContact.trim() }),
+      itemsSummary: items.map(item => `${item.quantity}x ${item.name}`).join(', '),
+      totalValue: Math.round(total * 100) / 100,
+    }),
+    onSuccess: (quote) => {
+      queryClient.invalidateQueries({ queryKey: ['/api/quotes'] });
+      toast({ title: "Cotação criada", description: quote.quoteNumber });
+      reset();
+      setOpen(false);
+    },
+    onError: (error: Error) => {
+      toast({ title: "Erro ao criar cotação", description: error.message, variant: "destructive" });
+    }
+  });
+
+  return (
+    <Dialog open={open} onOpenChange={setOpen}>
+      <DialogTrigger asChild>
+        <Button className="bg-primary text-primary-foreground hover:bg-primary/90" data-testid="button-new-quote">
+          <Plus className="mr-2 h-4 w-4" /> Nova Cotação
+        </Button>
+      </DialogTrigger>
+      <DialogContent className="sm:max-w-[560px]">
+        <DialogHeader>
+          <DialogTitle>Nova Cotação</DialogTitle>
+          <DialogDescription>Escolha o cliente (ou informe um lead) e adicione os produtos.</DialogDescription>
+        </DialogHeader>
+        <div className="grid gap-4">
+          <div className="grid gap-2">
+            <Label>Cliente</Label>
+            <Select value={clientId} onValueChange={setClientId}>
+              <SelectTrigger data-testid="select-quote-client">
+                <SelectValue placeholder="Lead sem cadastro" />
+              </SelectTrigger>
+              <SelectContent>
+                {clients?.map(client => (
+                  <SelectItem key={client.id} value={String(client.id)}>{client.name}</SelectItem>
+                ))}
+              </SelectContent>
+            </Select>
+          </div>
+          {clientId === "" && (
+            <div className="grid grid-cols-2 gap-2">
+              <Input placeholder="Nome do lead" value={leadName} onChange={e => setLeadName(e.target.value)} data-testid="input-quote-lead-name" />
+              <Input placeholder="Contato do lead" value={leadContact} onChange={e => setLeadContact(e.target.value)} data-testid="input-quote-lead-contact" />
+            </div>
+          )}
+          <div className="grid gap-2">
+            <Label>Produtos</Label>
+            <div className="flex gap-2">
+              <Select value={productId} onValueChange={setProductId}>
+                <SelectTrigger className="flex-1" data-testid="select-quote-product">
+                  <SelectValue placeholder={products ? "Escolha um produto" : "Carregando..."} />
+                </SelectTrigger>
+                <SelectContent>
+                  {products?.map(product => (
+                    <SelectItem key={product.id} value={String(product.id)}>
+                      {product.name} — {formatCurrency(product.price)}
+                    </SelectItem>
+                  ))}
+                </SelectContent>
+              </Select>
+              <Input type="number" min={1} className="w-20" value={quantity} onChange={e => setQuantity(e.target.value)} data-testid="input-quote-quantity" />
+              <Button type="button" variant="outline" onClick={addItem} disabled={!productId} data-testid="button-add-quote-item">
+                Adicionar
+              </Button>
+            </div>
+            {items.map((item, index) => (
+              <div key={index} className="flex items-center justify-between text-sm">
+                <span>{item.quantity}x {item.name}</span>
+                <span className="flex items-center gap-2">
+                  {formatCurrency(item.price * item.quantity)}
+                  <Button type="button" variant="ghost" size="icon" className="h-6 w-6" onClick={() => setItems(items.filter((_, i) => i !== index))}>
+                    <X className="h-3 w-3" />
+                  </Button>
+                </span>
+              </div>
+            ))}
+            {items.length > 0 && (
+              <div className="flex justify-between border-t pt-2 font-medium">
+                <span>Total</span>
+                <span>{formatCurrency(total)}</span>
+              </div>
+            )}
+          </div>
+        </div>
+        <DialogFooter>
+          <Button onClick={() => mutation.mutate()} disabled={!canSubmit || mutation.isPending} data-testid="button-save-quote">
+            {mutation.isPending && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+            Criar cotação
+          </Button>
+        </DialogFooter>
+      </DialogContent>
+    </Dialog>
+  );
+}
+
 export default function Quotes() {
+  const { toast } = useToast();
   const { data: quotes, isLoading } = useQuery({
     queryKey: ['/api/quotes'],
     queryFn: getQuotes
   });
 
-  const formatCurrency = (value: number) => {
-    return new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(value);
-  };
+  // Conversão no servidor, em uma transação; repetir devolve o mesmo pedido
+  const convert = useMutation({
+    mutationFn: (id: number) => convertQuote(id),
+    onSuccess: (order) => {
+      queryClient.invalidateQueries({ queryKey: ['/api/quotes'] });
+      queryClient.invalidateQueries({ queryKey: ['/api/orders'] });
+      toast({
+        title: order.alreadyConverted ? "Cotação já convertida" : "Pedido criado",
+        description: order.orderNumber
+      });
+    },
+    onError: (error: Error) => {
+      toast({ title: "Erro ao converter cotação", description: error.message, variant: "destructive" });
+    }
+  });
 
   return (
     <Layout>
@@ -56,9 +239,10 @@ export default function Quotes() {
           <h1 className="text-3xl font-serif font-bold text-foreground" data-testid="text-quotes-title">Cotações</h1>
           <p className="text-muted-foreground">Gerencie orçamentos e propostas comerciais.</p>
         </div>
-        <Button className="bg-primary text-primary-foreground hover:bg-primary/90" data-testid="button-new-quote">
-          <Plus className="mr-2 h-4 w-4" /> Nova Cotação
-        </Button>
+        <div className="flex gap-2">
+          <ExportMenu resource="quotes" />
+          <NewQuoteDialog />
+        </div>
       </div>
 
       <Card className="border-border/50 shadow-sm">
@@ -139,6 +323,13 @@ export default function Quotes() {
                           </DropdownMenuItem>
                           <DropdownMenuItem>Editar</DropdownMenuItem>
                           <DropdownMenuItem>Duplicar</DropdownMenuItem>
+                          <DropdownMenuItem
+                            disabled={quote.clientId === null || quote.status === 'Convertida' || convert.isPending}
+                            onClick={() => convert.mutate(quote.id)}
+                            data-testid={`button-convert-${quote.id}`}
+                          >
+                            Converter em pedido
+                          </DropdownMenuItem>
                           <DropdownMenuSeparator />
                           <DropdownMenuItem className="text-destructive">
                             Arquivar
@@ -0,0 +1,32 @@
+# Orçamento de conexões do banco (DB_CONNECTION_BUDGET), dividido entre os
+# workers e, dentro de cada worker, entre os engines que ele abre.
+#
+# gunicorn.conf.py: um engine (app Flask) por worker.
+# asgi.py (uvicorn): dois engines por worker, o assíncrono e o do app Flask
+# servido via a2wsgi.
+#
+# Sem import do app: o master do gunicorn carrega este módulo antes do fork.
+import os
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def connection_budget():
+    return env_int('DB_CONNECTION_BUDGET', 20)
+
+def engine_share(workers, engines=1):
+    """Conexões de cada engine de um worker: orçamento / workers / engines."""
+    per_worker = max(connection_budget() // max(workers, 1), 1)
+    return max(per_worker // engines, 1)
+
+def engine_pool(workers, concurrency, engines=1):
+    """(pool_size, max_overflow) de cada engine de um worker.
+
+    A fatia do worker (orçamento / workers) é dividida igualmente entre os
+    engines; o pool fixo não passa das requisições simultâneas que o engine
+    atende e o resto da fatia vira overflow.
+    """
+    per_engine = engine_share(workers, engines)
+    pool_size = max(min(concurrency, per_engine), 1)
+    return pool_size, max(per_engine - pool_size, 0)
@@ -0,0 +1,77 @@
+# Configuração do gunicorn (carregada automaticamente: gunicorn main:app)
+#
+# O pool de conexões de cada worker é derivado do orçamento de conexões do
+# banco (DB_CONNECTION_BUDGET) dividido entre os workers (db_budget.py, a
+# mesma conta do asgi.py), e repassado ao app via DB_POOL_SIZE / DB_MAX_OVERFLOW.
+import multiprocessing
+import os
+import sys
+
+# o gunicorn carrega este arquivo pelo caminho; db_budget.py está ao lado
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from db_budget import connection_budget, engine_pool, env_int  # noqa: E402
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = env_int('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = env_int('GUNICORN_THREADS', 4)
+worker_connections = env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+timeout = env_int('GUNICORN_TIMEOUT', 120)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('GUNICORN_ACCESSLOG')
+
+# Requisições simultâneas que um worker pode atender
+if worker_class == 'gevent':
+    per_worker_concurrency = worker_connections
+elif worker_class == 'gthread':
+    per_worker_concurrency = threads
+else:
+    per_worker_concurrency = 1
+
+db_budget = connection_budget()
+default_pool_size, default_max_overflow = engine_pool(workers, per_worker_concurrency)
+pool_size = env_int('DB_POOL_SIZE', default_pool_size)
+max_overflow = env_int('DB_MAX_OVERFLOW', default_max_overflow)
+
+# Os workers importam o app depois do fork e leem estes valores
+os.environ['DB_POOL_SIZE'] = str(pool_size)
+os.environ['DB_MAX_OVERFLOW'] = str(max_overflow)
+
+def on_starting(server):
+    # Métricas somadas entre workers (ver METRICS_DIR em app.py): começa do zero a cada start
+    metrics_dir = os.environ.get('METRICS_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            if name.endswith(('.json', '.tmp')):
+                os.remove(os.path.join(metrics_dir, name))
+
+def when_ready(server):
+    max_connections = workers * (pool_size + max_overflow)
+    server.log.info(
+        "[EMUNAH] Capacidade: %d workers x %d (%s) = %d requisições simultâneas; "
+        "pool %d+%d por worker = até %d conexões (orçamento %d)",
+        workers, per_worker_concurrency, worker_class, workers * per_worker_concurrency,
+        pool_size, max_overflow, max_connections, db_budget
+    )
+    if workers * per_worker_concurrency > max_connections:
+        server.log.warning(
+            "[EMUNAH] Mais requisições simultâneas que conexões: requisições vão esperar "
+            "até DB_POOL_TIMEOUT por uma conexão livre"
+        )
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning("[EMUNAH] psycogreen não instalado: psycopg2 vai bloquear o worker gevent")
+        else:
+            patch_psycopg()
+
+def worker_exit(server, worker):
+    # Worker reciclado (max_requests) ou encerrado: os contadores dele vão para o archive.json
+    from app import archive_worker_metrics
+    archive_worker_metrics()
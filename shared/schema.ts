@@ -68,7 +68,7 @@ export const quotes = pgTable("quotes", {
   itemsSummary: text("items_summary"),
   totalValue: numeric("total_value", { precision: 10, scale: 2 }).notNull(),
   status: text("status").default("Rascunho"),
-  createdAt: timestamp("created_at").defaultNow(),
+  createdAt: timestamp("created_at").defaultNow().notNull(),
 });
 
 export const orders = pgTable("orders", {
@@ -82,7 +82,7 @@ export const orders = pgTable("orders", {
   stage: text("stage").default("Aguardando"),
   progress: integer("progress").default(0),
   priority: text("priority").default("Normal"),
-  createdAt: timestamp("created_at").defaultNow(),
+  createdAt: timestamp("created_at").defaultNow().notNull(),
 });
 
 export const transactions = pgTable("transactions", {
@@ -94,8 +94,8 @@ export const transactions = pgTable("transactions", {
   type: text("type").notNull(),
   amount: numeric("amount", { precision: 10, scale: 2 }).notNull(),
   status: text("status").default("Pendente"),
-  transactionDate: date("transaction_date").defaultNow(),
-  createdAt: timestamp("created_at").defaultNow(),
+  transactionDate: date("transaction_date").defaultNow().notNull(),
+  createdAt: timestamp("created_at").defaultNow().notNull(),
 });
 
 export const insertClientSchema = createInsertSchema(clients).omit({ id: true, createdAt: true });